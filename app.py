@@ -1,16 +1,30 @@
-from flask import Flask, request, jsonify, send_file, render_template, send_from_directory, make_response
+from flask import Flask, Response, request, jsonify, send_file, render_template, send_from_directory, make_response
 from flask_cors import CORS
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 import re
 import json
 import csv
+import io
 from openpyxl import Workbook
 from datetime import datetime
 import os
 import time
 import logging
-from urllib.parse import urljoin, urlparse
+import threading
+import uuid
+import queue
+import sqlite3
+import tempfile
+import random
+from functools import partial
+from types import MappingProxyType
+from collections import OrderedDict
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 
 app = Flask(__name__)
 CORS(app)
@@ -26,12 +40,718 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class PatternSet:
+    """Ordered regex alternatives for one field, compiled once
+
+    The alternatives are also joined into a single regex. One scan with it
+    tells whether any alternative matches at all and which one matches
+    first in the text, so only the higher-priority alternatives before it
+    still have to be tried individually. Results are the same as trying
+    each pattern in order.
+    """
+
+    def __init__(self, name, patterns, flags=re.I):
+        self.name = name
+        self.sources = list(patterns)
+        self.patterns = [re.compile(pattern, flags) for pattern in self.sources]
+        self.combined = re.compile(
+            '|'.join(f'(?P<_{i}>{pattern})' for i, pattern in enumerate(self.sources)), flags
+        )
+        self.hits = [0] * len(self.patterns)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _record(self, index):
+        with self._lock:
+            self.calls += 1
+            if index is not None:
+                self.hits[index] += 1
+
+    def search(self, text):
+        """Return the match of the first pattern (in list order) that matches text"""
+        first = self.combined.search(text)
+        if first is None:
+            self._record(None)
+            return None
+
+        # Alternatives listed before the leftmost one may still match further on
+        index = int(first.lastgroup[1:])
+        for i in range(index):
+            match = self.patterns[i].search(text)
+            if match:
+                self._record(i)
+                return match
+        self._record(index)
+        return self.patterns[index].match(text, first.start())
+
+    def findall(self, text):
+        """Return re.findall results of every pattern, concatenated in list order"""
+        if self.combined.search(text) is None:
+            self._record(None)
+            return []
+        results = []
+        for i, pattern in enumerate(self.patterns):
+            matches = pattern.findall(text)
+            if matches:
+                self._record(i)
+                results.extend(matches)
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'hits': {source: hits for source, hits in zip(self.sources, self.hits)}
+            }
+
+
+# Every regex used during extraction, compiled once at import time
+PATTERNS = {pattern_set.name: pattern_set for pattern_set in [
+    PatternSet('institute', [
+        r'(Stanford\s+University)',
+        r'(INSEAD)',
+        r'(HEC\s+Paris)',
+        r'(IMD\s+Business\s+School)',
+        r'(LBS\s+Centre)',
+        r'([A-Z][a-z]+\s+University)',
+        r'([A-Z][a-z]+\s+College)',
+        r'([A-Z][a-z]+\s+School)',
+        r'(INSEAD\s+Business\s+School)',
+        r'(INSEAD\s+Executive\s+Education)',
+        r'(HEC\s+Paris\s+Business\s+School)',
+        r'(IMD\s+Business\s+School)',
+        r'(LBS\s+Centre,\s*Kerala)',
+        r'(LBS\s+Centre\s+for\s+Science\s+&\s+Technology)',
+        r'(LBS\s+Centre\s+for\s+Science\s+and\s+Technology)'
+    ]),
+    PatternSet('location', [
+        r'Location[:\s]+([^,\n]+)',
+        r'Address[:\s]+([^,\n]+)',
+        r'([A-Z][a-z]+,\s*[A-Z]{2})',
+        r'([A-Z][a-z]+,\s*[A-Z][a-z]+)'
+    ]),
+    PatternSet('location_fallback', [
+        r'(Stanford,\s*CA)',
+        r'(Stanford,\s*California)',
+        r'(Fontainebleau,\s*France)',
+        r'(Singapore)',
+        r'(Abu\s+Dhabi)',
+        r'(Lausanne,\s*Switzerland)',
+        r'(Kerala,\s*India)',
+        r'(Paris,\s*France)',
+        r'(INSEAD\s+Fontainebleau)',
+        r'(INSEAD\s+Singapore)',
+        r'(INSEAD\s+Abu\s+Dhabi)',
+        r'(HEC\s+Paris,\s*France)',
+        r'(IMD\s+Lausanne)',
+        r'(LBS\s+Centre,\s*Kerala)',
+        r'(Thiruvananthapuram,\s*Kerala)',
+        r'(India)'
+    ]),
+    PatternSet('format', [
+        r'(Online|On-campus|Hybrid|Distance|Remote)',
+        r'(Full-time|Part-time)',
+        r'(In-person|Virtual|Blended)'
+    ]),
+    PatternSet('language', [
+        r'Language[:\s]+([^,\n]+)',
+        r'Taught in[:\s]+([^,\n]+)',
+        r'([A-Z][a-z]+)\s+language'
+    ]),
+    PatternSet('dates', [
+        r'Start[:\s]+([^,\n]+)',
+        r'End[:\s]+([^,\n]+)',
+        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+        r'(\w+\s+\d{1,2},?\s+\d{4})'
+    ]),
+    PatternSet('duration', [
+        r'Duration[:\s]+([^,\n]+)',
+        r'(\d+\s+(weeks?|months?|years?|days?))',
+        r'(\d+-\d+\s+(weeks?|months?|years?))'
+    ]),
+    PatternSet('suitable_for', [
+        r'Suitable for[:\s]+([^,\n]+)',
+        r'Prerequisites[:\s]+([^,\n]+)',
+        r'Target audience[:\s]+([^,\n]+)',
+        r'Requirements[:\s]+([^,\n]+)'
+    ]),
+    PatternSet('fees', [
+        r'Fee[:\s]+([^,\n]+)',
+        r'Cost[:\s]+([^,\n]+)',
+        r'Price[:\s]+([^,\n]+)',
+        r'(\$[\d,]+)',
+        r'(\d+[\d,]*\s*(USD|EUR|GBP|CAD))'
+    ]),
+    PatternSet('availability', [
+        r'Enrollment[:\s]+([^,\n]+)',
+        r'Status[:\s]+([^,\n]+)',
+        r'Availability[:\s]+([^,\n]+)',
+        r'(Open|Closed|Full|Available|Limited)'
+    ]),
+    PatternSet('page_institute', [
+        r'(LBS\s+Centre\s+for\s+Science\s+&\s+Technology)',
+        r'(LBS\s+Centre\s+for\s+Science\s+and\s+Technology)',
+        r'(LBS\s+Centre)',
+        r'(Stanford\s+University)',
+        r'(INSEAD)',
+        r'(HEC\s+Paris)',
+        r'(IMD\s+Business\s+School)'
+    ]),
+    PatternSet('page_location', [
+        r'(Kerala,\s*India)',
+        r'(Thiruvananthapuram,\s*Kerala)',
+        r'(LBS\s+Centre,\s*Kerala)',
+        r'(Stanford,\s*CA)',
+        r'(Stanford,\s*California)',
+        r'(Fontainebleau,\s*France)',
+        r'(Singapore)',
+        r'(Abu\s+Dhabi)',
+        r'(Lausanne,\s*Switzerland)',
+        r'(Paris,\s*France)'
+    ]),
+    PatternSet('course_url', [
+        r'/courses/[^"\s]+',
+        r'/course/[^"\s]+',
+        r'/program/[^"\s]+'
+    ], flags=0)
+]}
+
+# Single-purpose regexes used for tree searches and table cells
+COURSE_CLASS_RE = re.compile(r'course|class|program', re.I)
+DIV_TABLE_CLASS_RE = re.compile(r'table|grid|list', re.I)
+DIV_ITEM_CLASS_RE = re.compile(r'course|item|row', re.I)
+COURSE_CODE_RE = re.compile(r'^[A-Z]{2,5}\s*\d+')
+QUARTER_RE = re.compile(r'^(FA|WI|SP|SU)$')
+# Words of a lower-cased table header label
+HEADER_WORD_RE = re.compile(r'[a-z#]+')
+
+# Header words that identify course catalog tables, with their weight in the table score
+COURSE_TABLE_HEADERS = {
+    'course': 2, 'code': 2, 'qtr': 2, 'quarter': 2, 'term': 2, 'format': 2, 'status': 2,
+    'duration': 2, 'fee': 2, 'fees': 2, 'credits': 2, 'units': 2, 'programme': 2, 'program': 2,
+    'title': 1, 'name': 1, 'days': 1, 'date': 1, 'dates': 1, 'schedule': 1, 'instructor': 1,
+    'details': 1, 'option': 1, 'price': 1, 'cost': 1, 'location': 1, '#': 1
+}
+# Table header labels mapped to course fields, exact matches first
+TABLE_HEADER_FIELDS = {
+    'code': 'code', 'course code': 'code', 'course #': 'code', 'course no': 'code', 'course number': 'code',
+    'course title': 'title', 'course name': 'title', 'title': 'title', 'name': 'title', 'course': 'title',
+    'programme': 'title', 'program': 'title',
+    'qtr': 'quarter', 'quarter': 'quarter', 'term': 'quarter',
+    'days': 'days', 'day': 'days', 'schedule': 'days',
+    'format': 'format', 'mode': 'format', 'delivery': 'format',
+    'status': 'status', 'availability': 'status',
+    'duration': 'duration', 'length': 'duration',
+    'course fee': 'fee', 'fee': 'fee', 'fees': 'fee', 'price': 'fee', 'cost': 'fee',
+    'close date': 'close_date', 'closing date': 'close_date', 'last date': 'close_date', 'deadline': 'close_date',
+    'dates': 'dates', 'date': 'dates', 'start date': 'dates',
+    'location': 'location', 'venue': 'location',
+    'instructor': 'instructor', 'faculty': 'instructor',
+    'option': 'option', 'apply': 'option'
+}
+# Fallback keyword matches for other header labels, most specific field first
+TABLE_FIELD_KEYWORDS = [
+    ('close_date', {'close', 'closing', 'deadline'}),
+    ('fee', {'fee', 'fees', 'price', 'cost'}),
+    ('duration', {'duration', 'length'}),
+    ('code', {'code'}),
+    ('quarter', {'qtr', 'quarter', 'term'}),
+    ('days', {'days', 'day', 'schedule'}),
+    ('format', {'format', 'mode', 'delivery'}),
+    ('status', {'status', 'availability'}),
+    ('dates', {'date', 'dates', 'start'}),
+    ('location', {'location', 'venue'}),
+    ('instructor', {'instructor', 'faculty', 'teacher'}),
+    ('title', {'title', 'name', 'course', 'programme', 'program'})
+]
+# Data rows read when scoring a table
+COURSE_TABLE_SAMPLE_ROWS = 5
+
+# Words in a link's text or href that suggest it leads to course pages, matched in one pass
+COURSE_LINK_KEYWORDS = [
+    'course', 'courses', 'class', 'program', 'programs', 'curriculum', 'syllabus',
+    'training', 'workshop', 'executive', 'education', 'mba', 'mim', 'emba',
+    'certificate', 'diploma', 'degree', 'module', 'session', 'seminar'
+]
+COURSE_LINK_RE = re.compile('|'.join(map(re.escape, COURSE_LINK_KEYWORDS)), re.I)
+# Link ranking: detail-page paths first, keyword hits next, navigation chrome last
+LINK_SCORE_COURSE_PATH = 4
+LINK_SCORE_HREF_KEYWORD = 2
+LINK_SCORE_TEXT_KEYWORD = 1
+LINK_SCORE_NAVIGATION = -3
+NAV_TAGS = {'nav', 'header', 'footer'}
+NAV_CLASS_RE = re.compile(r'nav|menu|breadcrumb', re.I)
+# Pagination links: rel="next", "Next"-style anchor text, or page numbers in the URL (not WordPress "?p=<post id>")
+NEXT_PAGE_TEXT_RE = re.compile(r'^\s*(next(\s+page)?|older|[›»>→]+)\s*[›»>→]*\s*$', re.I)
+PAGE_HREF_RE = re.compile(r'[?&](page|pg|start|offset)=\d+|/page/\d+', re.I)
+# Top-level elements kept when a listing page is parsed partially: everything link discovery reads
+LISTING_TAGS = {'a', 'link', 'nav', 'header', 'footer', 'title', 'meta'}
+
+class CourseMarkupFound(Exception):
+    """Raised by ListingStrainer to stop a partial parse that will not be enough"""
+
+
+class ListingStrainer(SoupStrainer):
+    """SoupStrainer that builds only the listing-page subtrees link discovery needs
+    
+    A kept element keeps its whole subtree, so anchors stay inside their nav
+    menus. Elements that could hold courses stop the parse with
+    CourseMarkupFound, since extracting courses needs the whole document.
+    bs4 < 4.13 asks search_tag() while parsing, newer versions ask
+    allow_tag_creation().
+    """
+    
+    @staticmethod
+    def keep(name, attrs):
+        classes = attrs.get('class') or ''
+        if not isinstance(classes, str):
+            classes = ' '.join(classes)
+        if (name == 'table'
+                or (name in ('div', 'article', 'section') and COURSE_CLASS_RE.search(classes))
+                or (name == 'div' and DIV_TABLE_CLASS_RE.search(classes))
+                or (name in ('div', 'article') and COURSE_CLASS_RE.search(attrs.get('id') or ''))):
+            raise CourseMarkupFound(name)
+        return name in LISTING_TAGS or bool(NAV_CLASS_RE.search(classes))
+    
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self.keep(markup_name, markup_attrs)
+    
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.keep(name, attrs or {})
+
+LISTING_STRAINER = ListingStrainer()
+
+# Content types parsed as pages; responses without a Content-Type are parsed too
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+# Links with these extensions are checked with a HEAD request before downloading
+NON_HTML_EXTENSIONS = {
+    '.pdf', '.doc', '.docx', '.ppt', '.pptx', '.xls', '.xlsx', '.zip', '.rar', '.gz',
+    '.mp4', '.mov', '.avi', '.webm', '.mp3', '.wav', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ics'
+}
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', '_gl'}
+
+class SiteAdapter:
+    """Extraction settings for one institution's site, selected once per URL by host
+
+    headers           extra request headers for the site's pages
+    table_selector    CSS selector for the course tables (skips table scoring)
+    table_schema      field -> column index for those tables (skips header analysis)
+    container_selector CSS selector for course containers (skips the class/id search)
+    link_selector     CSS selector for anchors that lead to course pages (skips the keyword scan)
+    link_patterns     PatternSet of course URL paths to pick out of the page text
+    """
+
+    def __init__(self, name, domains, headers=None, table_selector=None, table_schema=None,
+                 container_selector=None, link_selector=None, link_patterns=None):
+        self.name = name
+        self.domains = list(domains)
+        self.headers = MappingProxyType(dict(headers or {}))
+        self.table_selector = table_selector
+        self.table_schema = table_schema
+        self.container_selector = container_selector
+        self.link_selector = link_selector
+        self.link_patterns = link_patterns
+
+
+# Adapters keyed by registered domain; a host matches its own entry or any parent domain
+SITE_ADAPTERS = {}
+GENERIC_ADAPTER = SiteAdapter('generic', [])
+
+def register_site_adapter(adapter):
+    """Make an adapter available for its domains and all of their subdomains"""
+    for domain in adapter.domains:
+        SITE_ADAPTERS[domain.lower()] = adapter
+    return adapter
+
+def site_adapter_for(url):
+    """Return the adapter for a URL's host, or the generic adapter"""
+    host = (urlparse(url).hostname or '').lower()
+    labels = host.split('.')
+    # One dict lookup per domain level: a.b.stanford.edu, b.stanford.edu, stanford.edu, edu
+    for i in range(len(labels)):
+        adapter = SITE_ADAPTERS.get('.'.join(labels[i:]))
+        if adapter:
+            return adapter
+    return GENERIC_ADAPTER
+
+register_site_adapter(SiteAdapter(
+    'stanford',
+    ['stanford.edu'],
+    # Stanford responds better to a more common browser profile
+    headers={
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1'
+    },
+    # Continuing Studies catalog: Code | Course Title | Qtr | Days | Format | Status
+    table_schema={'code': 0, 'title': 1, 'quarter': 2, 'days': 3, 'format': 4, 'status': 5},
+    link_patterns=PATTERNS['course_url']
+))
+
+def pattern_stats():
+    """Call and hit counters for every registered pattern"""
+    return {name: pattern_set.stats() for name, pattern_set in PATTERNS.items()}
+
+class SessionPool:
+    """requests sessions keyed by host, each with its own keep-alive connection pool
+    
+    Session headers are fixed when the session is created and never changed;
+    site- or retry-specific headers are passed with each request instead, so
+    concurrent requests cannot see each other's headers.
+    """
+    
+    def __init__(self, headers, pool_maxsize=16, max_hosts=64):
+        self.headers = MappingProxyType(dict(headers))
+        self.pool_maxsize = pool_maxsize
+        self.max_hosts = max_hosts
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def session_for(self, url):
+        """Return the session for the URL's host, creating it on first use"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is not None:
+                self._sessions.move_to_end(host)
+                return session
+            session = requests.Session()
+            session.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._sessions[host] = session
+            # Close the least recently used hosts' connections
+            while len(self._sessions) > self.max_hosts:
+                _, stale = self._sessions.popitem(last=False)
+                stale.close()
+            return session
+    
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class HostThrottle:
+    """Per-host request pacing: at most `rate` requests/second with bursts of `burst`
+    
+    A token bucket per host, kept as the time the next request may start
+    (GCRA). wait() only sleeps the thread fetching that host; requests to other
+    hosts are not held up. Crawl-delay from robots.txt lowers a host's rate and
+    Retry-After pauses the host.
+    """
+    
+    def __init__(self, rate, burst=1, crawl_delay_lookup=None, max_delay=30):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.crawl_delay_lookup = crawl_delay_lookup
+        self.max_delay = max_delay
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def _host(self, url):
+        parts = urlparse(url)
+        host = parts.netloc.lower()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = {
+                    'lock': threading.Lock(), 'interval': 1 / self.rate if self.rate > 0 else 0,
+                    'burst': self.burst, 'next': 0.0, 'blocked_until': 0.0, 'robots': self.crawl_delay_lookup is None
+                }
+        if not state['robots']:
+            with state['lock']:
+                if not state['robots']:
+                    delay = self.crawl_delay_lookup(f"{parts.scheme}://{parts.netloc}")
+                    if delay:
+                        delay = min(float(delay), self.max_delay)
+                        logger.info(f"Honoring Crawl-delay of {delay}s for {host}")
+                        state['interval'] = max(state['interval'], delay)
+                        state['burst'] = 1
+                    state['robots'] = True
+        return state
+    
+    def wait(self, url):
+        """Block until a request to the URL's host is allowed, and claim that slot"""
+        state = self._host(url)
+        with state['lock']:
+            now = time.monotonic()
+            tolerance = (state['burst'] - 1) * state['interval']
+            start = max(now, state['next'] - tolerance, state['blocked_until'])
+            state['next'] = max(state['next'], start) + state['interval']
+        if start > now:
+            time.sleep(start - now)
+    
+    def defer(self, url, seconds):
+        """Hold back requests to the URL's host for the given number of seconds"""
+        seconds = min(seconds, self.max_delay)
+        state = self._host(url)
+        with state['lock']:
+            state['blocked_until'] = max(state['blocked_until'], time.monotonic() + seconds)
+        logger.info(f"Pausing requests to {urlparse(url).netloc} for {seconds:.1f}s (Retry-After)")
+
+
+def parse_retry_after(value):
+    """Return the seconds a Retry-After header asks to wait, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(when.tzinfo)).total_seconds())
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of contacting a host whose circuit breaker is open"""
+
+
+class UnsupportedContentError(requests.RequestException):
+    """Raised when a URL does not serve HTML (PDF brochures, videos, images...)"""
+
+
+class ResponseTooLargeError(requests.RequestException):
+    """Raised when a response body exceeds the download size limit"""
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker
+    
+    After `threshold` consecutive failed requests (connection errors, timeouts,
+    5xx) a host is skipped for `reset_after` seconds. Then one trial request is
+    let through (half-open): success closes the circuit, failure reopens it.
+    """
+    
+    def __init__(self, threshold=5, reset_after=60):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def before_request(self, url):
+        """Raise CircuitOpenError if requests to the URL's host should fail fast
+        
+        Returns True when the request is the half-open trial; the caller must
+        then record() its outcome or release() it.
+        """
+        if self.threshold <= 0:
+            return False
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state['failures'] < self.threshold:
+                return False
+            now = time.monotonic()
+            if now >= state['opened_at'] + self.reset_after and not state['trial']:
+                # Half-open: this request is the trial
+                state['trial'] = True
+                return True
+        raise CircuitOpenError(f"Circuit open for {host} after {state['failures']} consecutive failures")
+    
+    def record(self, url, success):
+        """Record the outcome of a request to the URL's host"""
+        if self.threshold <= 0:
+            return
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            state = self._hosts.setdefault(host, {'failures': 0, 'opened_at': 0.0, 'trial': False})
+            state['trial'] = False
+            if success:
+                state['failures'] = 0
+                return
+            state['failures'] += 1
+            if state['failures'] >= self.threshold:
+                state['opened_at'] = time.monotonic()
+                if state['failures'] == self.threshold:
+                    logger.warning(f"Opening circuit for {host} after {self.threshold} consecutive failures")
+    
+    def release(self, url):
+        """End a trial without an outcome, so the next request can be the trial"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state:
+                state['trial'] = False
+
+
+def parse_crawl_delay(robots_txt):
+    """Return the Crawl-delay of the robots.txt group for all agents ('*'), or None
+    
+    urllib.robotparser only reads whole seconds and drops groups without rules,
+    so the directive is read directly.
+    """
+    agents, in_agent_lines, delay = set(), False, None
+    for line in robots_txt.splitlines():
+        field, _, value = line.split('#', 1)[0].partition(':')
+        field, value = field.strip().lower(), value.strip()
+        if field == 'user-agent':
+            if not in_agent_lines:
+                agents = set()
+            agents.add(value)
+            in_agent_lines = True
+            continue
+        in_agent_lines = False
+        if field == 'crawl-delay' and '*' in agents:
+            try:
+                delay = float(value)
+            except ValueError:
+                pass
+    return delay
+
+
+class PageCache:
+    """Persistent HTTP response cache backed by SQLite
+    
+    Entries younger than ttl seconds are served without touching the network.
+    Older entries are revalidated with If-None-Match / If-Modified-Since, and
+    the least recently used entries are evicted once the stored bodies exceed
+    max_bytes.
+    """
+    
+    def __init__(self, path, ttl=3600, max_bytes=200 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    content_type TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)')
+    
+    def get(self, url):
+        """Return the cached entry for url as a dict, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, content_type, etag, last_modified, fetched_at FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (time.time(), url))
+        body, content_type, etag, last_modified, fetched_at = row
+        return {
+            'url': url,
+            'body': body,
+            'content_type': content_type,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': time.time() - fetched_at < self.ttl
+        }
+    
+    def put(self, url, response):
+        """Store a successful response unless the server forbids it"""
+        if 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return
+        body = response.content
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, body, response.headers.get('Content-Type'), response.headers.get('ETag'),
+                 response.headers.get('Last-Modified'), now, now, len(body))
+            )
+            self._evict()
+    
+    def touch(self, url):
+        """Mark an entry as fresh again after a 304 Not Modified"""
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE pages SET fetched_at = ? WHERE url = ?', (time.time(), url))
+    
+    def _evict(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute('SELECT url, size FROM pages ORDER BY accessed_at').fetchall():
+            self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+    
+    @staticmethod
+    def to_response(entry):
+        """Build a requests.Response from a cached entry"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry['url']
+        response._content = entry['body']
+        if entry['content_type']:
+            response.headers['Content-Type'] = entry['content_type']
+        response.headers['X-Cache'] = 'HIT'
+        return response
+
+class PageContext:
+    """Analysis of one parsed page, shared by every extraction stage
+    
+    get_text() walks the whole subtree, so the page text and the text of each
+    element that is inspected are computed once here and reused.
+    """
+    
+    def __init__(self, soup, url, trace=False, adapter=None):
+        self.soup = soup
+        self.url = url
+        self.adapter = adapter or site_adapter_for(url)
+        self.trace_enabled = trace
+        self.counters = {}
+        self._text = None
+        self._element_texts = {}
+        # Filled in by CourseExtractor._page_head_metadata / _page_text_metadata on first use
+        self.head_metadata = None
+        self.text_metadata = None
+    
+    @property
+    def text(self):
+        """Text of the whole document"""
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+    
+    def element_text(self, element):
+        """Text of an element within this document"""
+        key = id(element)
+        if key not in self._element_texts:
+            self._element_texts[key] = element.get_text()
+        return self._element_texts[key]
+    
+    @property
+    def tracing(self):
+        """Whether detailed diagnostics are wanted for this page"""
+        return self.trace_enabled or logger.isEnabledFor(logging.DEBUG)
+    
+    def trace(self, render):
+        """Log a diagnostic message, calling render() only when tracing"""
+        if self.tracing:
+            logger.log(logging.INFO if self.trace_enabled else logging.DEBUG, render())
+    
+    def count(self, name, amount=1):
+        """Increment a cheap diagnostic counter"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
 class CourseExtractor:
     def __init__(self):
-        self.session = requests.Session()
-        
         # Enhanced headers to appear more like a real browser
-        self.session.headers.update({
+        default_headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -44,7 +764,13 @@ class CourseExtractor:
             'Sec-Fetch-Site': 'none',
             'Sec-Fetch-User': '?1',
             'Cache-Control': 'max-age=0'
-        })
+        }
+        # One session per host; pool size is the keep-alive connections kept per host
+        self.sessions = SessionPool(
+            default_headers,
+            pool_maxsize=max(1, int(os.getenv('SESSION_POOL_MAXSIZE', '16'))),
+            max_hosts=max(1, int(os.getenv('SESSION_POOL_MAX_HOSTS', '64')))
+        )
         
         # List of user agents to rotate through
         self.user_agents = [
@@ -54,88 +780,261 @@ class CourseExtractor:
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15'
         ]
+        # Politeness: requests/second and burst per host, robots.txt Crawl-delay and Retry-After
+        self.throttle = HostThrottle(
+            rate=float(os.getenv('HOST_MAX_RPS', '5')),
+            burst=int(os.getenv('HOST_BURST', '4')),
+            crawl_delay_lookup=self._robots_crawl_delay if os.getenv('RESPECT_CRAWL_DELAY', 'true').lower() == 'true' else None,
+            max_delay=float(os.getenv('MAX_HOST_DELAY', '30'))
+        )
+        # Retries for connection errors and transient statuses, with exponential backoff and jitter
+        self.retry_attempts = max(1, int(os.getenv('RETRY_ATTEMPTS', '3')))
+        self.retry_statuses = {int(code) for code in os.getenv('RETRY_STATUSES', '429,500,502,503,504').split(',') if code.strip()}
+        self.retry_read_errors = os.getenv('RETRY_READ_ERRORS', 'false').lower() == 'true'
+        self.retry_backoff = float(os.getenv('RETRY_BACKOFF', '0.5'))
+        self.retry_backoff_max = float(os.getenv('RETRY_BACKOFF_MAX', '8'))
+        # Download guards: body size limit and HEAD preflight for links that look like files
+        self.max_response_bytes = int(os.getenv('MAX_RESPONSE_BYTES', str(5 * 1024 * 1024)))
+        self.preflight_extensions = os.getenv('PREFLIGHT_EXTENSIONS', 'true').lower() == 'true'
+        # Fail fast on hosts that keep failing (BREAKER_THRESHOLD=0 disables)
+        self.breaker = CircuitBreaker(
+            threshold=int(os.getenv('BREAKER_THRESHOLD', '5')),
+            reset_after=float(os.getenv('BREAKER_RESET', '60'))
+        )
         # Safety limit for following course links from a listing page
         self.max_course_pages = int(os.getenv('MAX_COURSE_PAGES', '100'))
+        # Stop following course links once this many courses were found (0 = follow all)
+        self.course_yield_target = int(os.getenv('COURSE_YIELD_TARGET', '0'))
+        # Pagination crawl limits: hops away from the submitted URL and listing pages fetched in total
+        self.crawl_max_depth = max(0, int(os.getenv('CRAWL_MAX_DEPTH', '5')))
+        self.crawl_max_pages = max(1, int(os.getenv('CRAWL_MAX_PAGES', '10')))
+        # Minimum _score_course_table score for a table to be treated as a course catalog
+        self.course_table_min_score = int(os.getenv('COURSE_TABLE_MIN_SCORE', '3'))
+        # Concurrency limits for fetching course detail pages
+        self.fetch_concurrency = max(1, int(os.getenv('FETCH_CONCURRENCY', '8')))
+        self.per_host_concurrency = max(1, int(os.getenv('PER_HOST_CONCURRENCY', '4')))
+        self._host_semaphores = {}
+        self._host_semaphores_lock = threading.Lock()
+        # HTML parser used by BeautifulSoup ('lxml' or 'html.parser')
+        self.parser = self._resolve_parser(os.getenv('HTML_PARSER', 'lxml'))
+        # Parse listing pages partially first; the full tree is built only if the page can hold courses
+        self.partial_parse = os.getenv('PARTIAL_PARSE', 'true').lower() == 'true'
+        # On-disk cache of fetched pages (set HTTP_CACHE_PATH to an empty value to disable)
+        cache_path = os.getenv('HTTP_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'course_extractor_cache.sqlite3'))
+        self.cache = PageCache(
+            cache_path,
+            ttl=float(os.getenv('HTTP_CACHE_TTL', '3600')),
+            max_bytes=int(os.getenv('HTTP_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+        ) if cache_path else None
+    
+    @staticmethod
+    def _resolve_parser(name):
+        """Return a usable BeautifulSoup parser name, falling back to html.parser"""
+        if name not in ('lxml', 'html.parser'):
+            logger.warning(f"Unknown HTML_PARSER '{name}', using html.parser")
+            return 'html.parser'
+        if name == 'lxml':
+            try:
+                import lxml  # noqa: F401
+            except ImportError:
+                logger.warning("lxml is not installed, using html.parser")
+                return 'html.parser'
+        return name
     
-    def _rotate_user_agent(self):
-        """Rotate to a different user agent"""
-        import random
-        new_agent = random.choice(self.user_agents)
-        self.session.headers.update({'User-Agent': new_agent})
-        return new_agent
-    
-    def _add_random_delay(self):
-        """Add a random delay to appear more human-like"""
-        import random
-        import time
-        delay = random.uniform(1, 3)  # Random delay between 1-3 seconds
-        time.sleep(delay)
-        
-    def extract_course_info(self, url):
-        """Extract course information from a given URL"""
+    def _parse(self, content):
+        """Parse an HTML document with the configured parser backend"""
+        return BeautifulSoup(content, self.parser)
+    
+    def _parse_listing(self, content, adapter, trace=False):
+        """Parse a listing page, building only the link-discovery subtrees when that is enough
+        
+        Courses are only extracted from tables, course containers and div
+        tables, and extracting them also reads the page text and metadata. A
+        page without those elements can only yield links, so the partial tree
+        is used; as soon as one shows up the full document is parsed instead.
+        """
+        # Adapter selectors, page-text link patterns and trace output need the whole document
+        if not self.partial_parse or trace or adapter.table_selector or adapter.container_selector or adapter.link_patterns:
+            return self._parse(content)
+        
+        try:
+            soup = BeautifulSoup(content, self.parser, parse_only=LISTING_STRAINER)
+        except CourseMarkupFound:
+            return self._parse(content)
+        # Kept subtrees (nav, header...) are not screened while parsing
+        if (soup.find('table')
+                or soup.find(['div', 'article', 'section'], class_=COURSE_CLASS_RE)
+                or soup.find('div', class_=DIV_TABLE_CLASS_RE)
+                or soup.find(['div', 'article'], id=COURSE_CLASS_RE)):
+            return self._parse(content)
+        return soup
+    
+    def _rotate_user_agent(self, headers):
+        """Return a copy of a header profile with a different user agent"""
+        return {**headers, 'User-Agent': random.choice(self.user_agents)}
+    
+    def _robots_crawl_delay(self, origin):
+        """Return the Crawl-delay robots.txt at origin sets for all agents, or None"""
+        try:
+            response = self.sessions.session_for(origin).get(f"{origin}/robots.txt", timeout=5)
+        except requests.RequestException as e:
+            logger.debug(f"Could not fetch robots.txt from {origin}: {e}")
+            return None
+        if response.status_code != 200:
+            return None
+        return parse_crawl_delay(response.text)
+        
+    def _get(self, url, timeout, headers=None):
+        """GET a page, serving and revalidating it through the response cache"""
+        entry = self.cache.get(url) if self.cache else None
+        if entry and entry['fresh']:
+            logger.info(f"Cache hit for {url}")
+            return PageCache.to_response(entry)
+        
+        headers = dict(headers or {})
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        
+        response = self._fetch(url, timeout, headers)
+        if entry and response.status_code == 304:
+            logger.info(f"Cache revalidated for {url}")
+            self.cache.touch(url)
+            return PageCache.to_response(entry)
+        if self.cache and response.status_code == 200:
+            self.cache.put(url, response)
+        return response
+    
+    def _fetch(self, url, timeout, headers):
+        """GET a URL over the network, retrying per the retry policy and circuit breaker"""
+        trial = self.breaker.before_request(url)
+        try:
+            return self._fetch_attempts(url, timeout, headers)
+        finally:
+            # A trial that ends without an outcome (e.g. a rejected preflight) must not hold the circuit open
+            if trial:
+                self.breaker.release(url)
+    
+    def _fetch_attempts(self, url, timeout, headers):
+        """Preflight and GET a URL, retrying connection errors and RETRY_STATUSES"""
+        session = self.sessions.session_for(url)
+        if self.preflight_extensions and os.path.splitext(urlsplit(url).path)[1].lower() in NON_HTML_EXTENSIONS:
+            self._preflight(session, url, timeout, headers)
+        for attempt in range(1, self.retry_attempts + 1):
+            self.throttle.wait(url)
+            try:
+                response = session.get(url, timeout=timeout, headers=headers, stream=True)
+            except requests.RequestException as e:
+                # Connect failures are cheap to retry; read timeouts already cost a full timeout
+                retryable = isinstance(e, requests.ConnectionError) or (
+                    self.retry_read_errors and isinstance(e, requests.Timeout))
+                if not retryable or attempt == self.retry_attempts:
+                    self.breaker.record(url, False)
+                    raise
+                logger.warning(f"Attempt {attempt} for {url} failed: {e}")
+            else:
+                if response.status_code in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after:
+                        self.throttle.defer(url, retry_after)
+                if response.status_code not in self.retry_statuses or attempt == self.retry_attempts:
+                    self.breaker.record(url, response.status_code < 500)
+                    return self._read_body(url, response)
+                logger.warning(f"Attempt {attempt} for {url} returned {response.status_code}")
+                response.close()
+            time.sleep(self._backoff(attempt))
+    
+    def _preflight(self, session, url, timeout, headers):
+        """HEAD a URL whose extension suggests a file, raising if it is not HTML"""
+        self.throttle.wait(url)
+        try:
+            response = session.head(url, timeout=timeout, headers=headers, allow_redirects=True)
+        except requests.RequestException as e:
+            # Let the GET decide; the preflight is only an optimization
+            logger.debug(f"Preflight for {url} failed: {e}")
+            return
+        self._check_content_type(url, response)
+    
+    @staticmethod
+    def _check_content_type(url, response):
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code == 200 and content_type and not content_type.lower().startswith(HTML_CONTENT_TYPES):
+            raise UnsupportedContentError(f"Skipped {url}: not an HTML page ({content_type.split(';')[0]})")
+    
+    def _read_body(self, url, response):
+        """Read a streamed response into response.content, enforcing the type and size guards"""
+        try:
+            self._check_content_type(url, response)
+            length = response.headers.get('Content-Length', '')
+            if length.isdigit() and int(length) > self.max_response_bytes:
+                raise ResponseTooLargeError(f"Skipped {url}: {int(length)} bytes exceeds MAX_RESPONSE_BYTES")
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > self.max_response_bytes:
+                    raise ResponseTooLargeError(f"Aborted {url}: body exceeds {self.max_response_bytes} bytes")
+                chunks.append(chunk)
+            response._content = b''.join(chunks)
+            response._content_consumed = True
+        finally:
+            response.close()
+        return response
+    
+    def _backoff(self, attempt):
+        """Seconds to wait before retry number `attempt` (exponential, full jitter)"""
+        return random.uniform(0, min(self.retry_backoff_max, self.retry_backoff * 2 ** (attempt - 1)))
+    
+    def extract_course_info(self, url, on_course=None, trace=False, cancel=None):
+        """Extract course information from a given URL
+        
+        If on_course is given it is called with each course as soon as it is
+        extracted, before the full result is returned. trace logs detailed
+        diagnostics for this URL at INFO level and adds counters to the result.
+        Once the cancel event is set no further pages are fetched.
+        """
         try:
             logger.info(f"Extracting course info from: {url}")
             
-            # Try Stanford with a different approach - use a more common user agent
-            if 'stanford' in url.lower():
-                self.session.headers.update({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                })
-                logger.info("Using Stanford-specific headers")
-            
-            # Temporarily disable delays and user agent rotation for debugging
-            # self._rotate_user_agent()
-            # self._add_random_delay()
+            adapter = site_adapter_for(url)
+            if adapter is not GENERIC_ADAPTER:
+                logger.info(f"Using {adapter.name} site adapter")
             
             # Try with requests first
-            response = self.session.get(url, timeout=15)  # Increased timeout
+            response = self._get(url, timeout=15, headers=adapter.headers)  # Increased timeout
             
             # Log response details for debugging
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response headers: {dict(response.headers)}")
-            logger.info(f"Response content length: {len(response.content)}")
+            logger.info(f"Response status: {response.status_code}, content length: {len(response.content)}")
+            if trace or logger.isEnabledFor(logging.DEBUG):
+                logger.log(logging.INFO if trace else logging.DEBUG, f"Response headers: {dict(response.headers)}")
             
             # Check if we got blocked
             if response.status_code == 403:
                 logger.warning(f"Got 403 Forbidden for {url}, trying with different approach")
-                # Try with a different user agent
-                self._rotate_user_agent()
-                self._add_random_delay()
-                response = self.session.get(url, timeout=15)
+                # Try with a different user agent; the host throttle paces the retry
+                response = self._get(url, timeout=15, headers=self._rotate_user_agent(adapter.headers))
             
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse_listing(response.content, adapter, trace)
+            page = PageContext(soup, url, trace, adapter)
             
-            # Extract basic information
-            courses = self._extract_courses_from_page(soup, url)
+            courses, course_links, next_pages = self._scan_listing_page(page, on_course)
+            courses.extend(self._crawl_pagination(page, hash(response.content), next_pages, course_links, on_course, cancel))
             
-            # If no courses found, try to find course listing pages
-            if not courses:
-                course_links = self._find_course_links(soup, url)
-                courses = []
-                for link in course_links[:self.max_course_pages]:  # Use configurable limit
-                    try:
-                        course_info = self._extract_single_course(link, url)
-                        if course_info:
-                            courses.append(course_info)
-                        # Add delay between requests
-                        # self._add_random_delay()
-                    except Exception as e:
-                        logger.warning(f"Failed to extract from {link}: {e}")
-                        continue
+            # Pages without listed courses contribute links to course detail pages
+            if course_links:
+                courses.extend(self._extract_course_pages(course_links[:self.max_course_pages], url, on_course, cancel))  # Use configurable limit
             
-            return {
+            result = {
                 'success': True,
                 'url': url,
                 'courses_found': len(courses),
                 'courses': courses
             }
+            if trace:
+                result['diagnostics'] = page.counters
+            return result
             
         except requests.RequestException as e:
             logger.error(f"Request error for {url}: {e}")
@@ -152,121 +1051,334 @@ class CourseExtractor:
                 'error': f"Unexpected error: {str(e)}"
             }
     
-    def _extract_courses_from_page(self, soup, base_url):
+    def _scan_listing_page(self, page, on_course=None):
+        """Return (courses, course links, pagination links) for a parsed listing page
+        
+        Course links are only collected when the page itself lists no courses.
+        """
+        courses = self._extract_courses_from_page(page.soup, page.url, page)
+        if on_course:
+            for course in courses:
+                on_course(course)
+        
+        # If no courses found, try to find course listing pages
+        course_links = [] if courses else self._find_course_links(page.soup, page.url, page)
+        return courses, course_links, self._find_pagination_links(page.soup, page.url)
+    
+    def _crawl_pagination(self, first_page, first_fingerprint, next_pages, course_links, on_course=None, cancel=None):
+        """Follow pagination from the first listing page, breadth first
+        
+        Listing pages of one level are fetched concurrently, up to crawl_max_depth
+        hops and crawl_max_pages pages in total. Courses found on them are
+        returned; their course links are appended to course_links, deduplicated
+        and without listing pages already visited. first_fingerprint is the hash
+        of the first page's response body.
+        """
+        visited = {self._link_key(first_page.url)}
+        # "1" usually links to "?page=1", a second URL for the first page; compare the bodies too.
+        # Hash the raw body: a partially parsed page's text only covers its links and nav
+        fingerprints = {first_fingerprint}
+        seen_links = {self._link_key(link) for link in course_links}
+        courses = []
+        pages_fetched = 1
+        depth = 0
+        
+        while next_pages and depth < self.crawl_max_depth and pages_fetched < self.crawl_max_pages:
+            if cancel and cancel.is_set():
+                logger.info(f"Extraction of {first_page.url} cancelled, not following {len(next_pages)} pagination links")
+                break
+            depth += 1
+            level = []
+            for link in next_pages:
+                key = self._link_key(link)
+                if key not in visited and pages_fetched + len(level) < self.crawl_max_pages:
+                    visited.add(key)
+                    level.append(link)
+            if not level:
+                break
+            pages_fetched += len(level)
+            logger.info(f"Following {len(level)} pagination links at depth {depth}")
+            
+            next_pages = []
+            for scanned in self._fetch_listing_pages(level, fingerprints, on_course, cancel):
+                if scanned is None:
+                    continue
+                page_courses, page_links, page_next = scanned
+                courses.extend(page_courses)
+                next_pages.extend(page_next)
+                for link in page_links:
+                    key = self._link_key(link)
+                    if key not in seen_links:
+                        seen_links.add(key)
+                        course_links.append(link)
+        
+        # Pagination links also look like course links ("/courses?page=2"); don't fetch them twice
+        course_links[:] = [link for link in course_links if self._link_key(link) not in visited]
+        return courses
+    
+    def _fetch_listing_pages(self, links, fingerprints, on_course=None, cancel=None):
+        """Fetch and scan listing pages concurrently, returning results in link order
+        
+        Pages whose body hash is already in fingerprints, or that were not
+        started before the cancel event was set, are skipped (None).
+        """
+        lock = threading.Lock()
+        
+        def fetch(link):
+            with self._host_semaphore(link):
+                if cancel and cancel.is_set():
+                    return None
+                try:
+                    adapter = site_adapter_for(link)
+                    response = self._get(link, timeout=15, headers=adapter.headers)
+                    response.raise_for_status()
+                    fingerprint = hash(response.content)
+                    with lock:
+                        if fingerprint in fingerprints:
+                            logger.info(f"Skipping {link}: same content as a page already crawled")
+                            return None
+                        fingerprints.add(fingerprint)
+                    page = PageContext(self._parse_listing(response.content, adapter), link, adapter=adapter)
+                    return self._scan_listing_page(page, on_course)
+                except Exception as e:
+                    logger.warning(f"Failed to crawl listing page {link}: {e}")
+                    return None
+        
+        with ThreadPoolExecutor(max_workers=min(self.fetch_concurrency, len(links))) as pool:
+            return list(pool.map(fetch, links))
+    
+    def _find_pagination_links(self, soup, base_url):
+        """Find same-site links to further pages of a paginated listing"""
+        base_netloc = urlsplit(base_url).netloc
+        pages = {}
+        
+        candidates = soup.find_all(['a', 'link'], rel='next', href=True)
+        for link in soup.find_all('a', href=True):
+            if PAGE_HREF_RE.search(link['href']) or NEXT_PAGE_TEXT_RE.match(link.get_text()):
+                candidates.append(link)
+        
+        for link in candidates:
+            parts = urlsplit(urljoin(base_url, link['href']))
+            if parts.netloc == base_netloc:
+                url, key = self._normalize_link(parts)
+                pages.setdefault(key, url)
+        return list(pages.values())
+    
+    def _link_key(self, url):
+        """Dedupe key of an absolute URL (see _normalize_link)"""
+        return self._normalize_link(urlsplit(url))[1]
+    
+    def _host_semaphore(self, url):
+        """Return the semaphore that caps concurrent requests to the URL's host"""
+        host = urlparse(url).netloc.lower()
+        with self._host_semaphores_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_concurrency)
+                self._host_semaphores[host] = semaphore
+        return semaphore
+    
+    def _extract_course_pages(self, links, base_url, on_course=None, cancel=None):
+        """Fetch course detail pages concurrently, keeping the original link order
+        
+        Pages not started before the cancel event is set are skipped.
+        """
+        if not links:
+            return []
+        
+        def fetch(link):
+            with self._host_semaphore(link):
+                if cancel and cancel.is_set():
+                    return None
+                try:
+                    return self._extract_single_course(link, base_url)
+                except Exception as e:
+                    logger.warning(f"Failed to extract from {link}: {e}")
+                    return None
+        
+        workers = min(self.fetch_concurrency, len(links))
+        target = self.course_yield_target
+        logger.info(f"Fetching {len(links)} course pages with {workers} workers")
+        results = [None] * len(links)
+        found = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Submitted in rank order, so the most promising links are fetched first
+            futures = {pool.submit(fetch, link): index for index, link in enumerate(links)}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                course = future.result()
+                results[futures[future]] = course
+                if course:
+                    found += 1
+                    if on_course:
+                        on_course(course)
+                    if target and found == target:
+                        # Pages already being fetched still finish; queued ones are dropped
+                        skipped = sum(f.cancel() for f in futures)
+                        logger.info(f"Reached {target} courses, skipping {skipped} remaining links")
+        
+        return [course for course in results if course]
+    
+    def _extract_courses_from_page(self, soup, base_url, page=None):
         """Extract multiple courses from a page"""
         courses = []
+        page = page or PageContext(soup, base_url)
         
         # First, try to extract from table-based course listings (like Stanford Continuing Studies)
-        table_courses = self._extract_courses_from_table(soup, base_url)
+        table_courses = self._extract_courses_from_table(soup, base_url, page)
         if table_courses:
             courses.extend(table_courses)
         
         # Look for course containers in divs/articles
-        course_containers = soup.find_all(['div', 'article', 'section'], class_=re.compile(r'course|class|program', re.I))
+        if page.adapter.container_selector:
+            course_containers = soup.select(page.adapter.container_selector)
+        else:
+            course_containers = soup.find_all(['div', 'article', 'section'], class_=COURSE_CLASS_RE)
         
-        if not course_containers:
+        if not course_containers and not page.adapter.container_selector:
             # Try alternative selectors
-            course_containers = soup.find_all(['div', 'article'], id=re.compile(r'course|class|program', re.I))
+            course_containers = soup.find_all(['div', 'article'], id=COURSE_CLASS_RE)
         
         for container in course_containers:
             course_info = self._extract_single_course_from_container(container, base_url)
             if course_info:
-                try:
-                    page_root = soup
-                    course_info = self._apply_fallbacks(course_info, page_root)
-                except Exception:
-                    pass
+                course_info = self._apply_fallbacks(course_info, page)
                 courses.append(course_info)
         
         return courses
     
-    def _extract_courses_from_table(self, soup, base_url):
+    def _extract_courses_from_table(self, soup, base_url, page):
         """Extract courses from table-based course listings"""
         courses = []
         
         # Look for tables that might contain course information
-        tables = soup.find_all('table')
-        logger.info(f"Found {len(tables)} tables on the page")
+        adapter = page.adapter
+        tables = soup.select(adapter.table_selector) if adapter.table_selector else soup.find_all('table')
+        page.count('tables', len(tables))
         
         # For debugging: print the first 1000 chars of page content
-        page_content = soup.get_text()[:1000]
-        logger.info(f"Page content preview: {page_content}")
+        page.trace(lambda: f"Page content preview: {page.text[:1000]}")
         
         # Also look for other table-like structures
-        div_tables = soup.find_all('div', class_=re.compile(r'table|grid|list', re.I))
-        logger.info(f"Found {len(div_tables)} div-based table structures")
-        
-        # Look for any divs that might contain course listings (Stanford specific)
-        if 'stanford' in base_url.lower():
-            # Look for divs containing course-like content
-            course_divs = soup.find_all('div', string=re.compile(r'ARCH|ARTH|CW|TECH|WELL|FICT|SCI', re.I))
-            logger.info(f"Found {len(course_divs)} Stanford course divs")
-            
-            # Also look for any div with course-related text
-            course_containers = soup.find_all('div', string=re.compile(r'course|class|program', re.I))
-            logger.info(f"Found {len(course_containers)} course containers")
+        div_tables = soup.find_all('div', class_=DIV_TABLE_CLASS_RE)
+        page.count('div_tables', len(div_tables))
         
+        table_courses = []
         for i, table in enumerate(tables):
-            # Check if this table looks like a course catalog
-            table_text = table.get_text().lower()
-            logger.info(f"Table {i}: Text preview: {table_text[:200]}...")
-            logger.info(f"Table {i}: HTML structure: {str(table)[:500]}...")
+            page.trace(lambda: f"Table {i}: Text preview: {page.element_text(table).lower()[:200]}...")
+            page.trace(lambda: f"Table {i}: HTML structure: {str(table)[:500]}...")
             
-            # More flexible table detection for Stanford Continuing Studies
-            is_course_table = (
-                any(keyword in table_text for keyword in ['course', 'code', 'title', 'format', 'status', 'quarter']) or
-                any(keyword in table_text for keyword in ['arch', 'arth', 'cw', 'tech', 'well', 'fict', 'sci']) or  # Stanford course codes
-                'fa' in table_text or 'wi' in table_text or 'sp' in table_text or 'su' in table_text or  # Quarter abbreviations
-                any(keyword in table_text for keyword in ['online', 'on-campus', 'off-campus']) or  # Format indicators
-                any(keyword in table_text for keyword in ['open', 'closed', 'wait list']) or  # Status indicators
-                len(table_text) > 100  # Large tables are more likely to be course catalogs
-            )
-            
-            logger.info(f"Table {i} course detection result: {is_course_table}")
+            # Check if this table looks like a course catalog from its header and
+            # column shape before touching any rows
+            rows = table.find_all('tr')
+            if adapter.table_selector:
+                # The adapter already knows these are course tables; a header alone has no rows
+                score = self.course_table_min_score if len(rows) >= 2 else 0
+            else:
+                score = self._score_course_table(table, rows)
+            is_course_table = score >= self.course_table_min_score
+            page.trace(lambda: f"Table {i}: course table score {score} (threshold {self.course_table_min_score})")
             
             if is_course_table:
-                logger.info(f"Table {i} identified as course catalog")
-                rows = table.find_all('tr')
-                logger.info(f"Table {i} has {len(rows)} rows")
+                page.count('course_tables')
+                header_cells = [cell.get_text(strip=True) for cell in rows[0].find_all(['td', 'th'])]
+                schema = self._table_schema(header_cells, page.element_text(table), adapter.table_schema)
+                page.trace(lambda: f"Table {i} identified as course catalog with {len(rows)} rows, schema {schema}")
                 
                 for row_idx, row in enumerate(rows[1:], 1):  # Skip header row
-                    cells = row.find_all(['td', 'th'])
-                    logger.info(f"Row {row_idx} has {len(cells)} cells")
-                    if len(cells) >= 3:  # Need at least course code, title, and some other info
-                        course_info = self._extract_course_from_table_row(cells, base_url, table_text)
+                    # Read each cell's text exactly once
+                    texts = [cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
+                    page.count('rows')
+                    if len(texts) >= 3:  # Need at least course code, title, and some other info
+                        course_info = self._extract_course_from_table_row(texts, schema)
                         if course_info:
-                            logger.info(f"Successfully extracted course from row {row_idx}: {course_info['course_name']}")
-                            # Apply page-level metadata to this course
-                            course_info = self._apply_page_metadata(course_info, soup, base_url)
-                            courses.append(course_info)
+                            page.count('rows_extracted')
+                            page.trace(lambda: f"Successfully extracted course from row {row_idx}: {course_info['course_name']}")
+                            table_courses.append(course_info)
                         else:
-                            logger.info(f"No course info extracted from row {row_idx}")
+                            page.trace(lambda: f"No course info extracted from row {row_idx}")
             else:
-                logger.info(f"Table {i} not identified as course catalog")
+                page.trace(lambda: f"Table {i} not identified as course catalog")
+        
+        # Apply page-level metadata to all table rows at once
+        courses.extend(self._apply_page_metadata(table_courses, page))
         
         # Also try to extract from div-based table structures
         for i, div_table in enumerate(div_tables):
-            div_text = div_table.get_text().lower()
-            logger.info(f"Div table {i}: Text preview: {div_text[:200]}...")
+            div_text = page.element_text(div_table).lower()
+            page.trace(lambda: f"Div table {i}: Text preview: {div_text[:200]}...")
             
             # Check if this div contains course information
             if any(keyword in div_text for keyword in ['course', 'code', 'title', 'format', 'status', 'quarter']):
-                logger.info(f"Div table {i} identified as course catalog")
+                page.count('course_div_tables')
                 # Try to extract courses from this div structure
                 div_courses = self._extract_courses_from_div_structure(div_table, base_url)
                 if div_courses:
                     courses.extend(div_courses)
         
-        logger.info(f"Total courses extracted from tables: {len(courses)}")
+        logger.info(
+            f"Tables: {page.counters.get('course_tables', 0)}/{len(tables)} course catalogs, "
+            f"{page.counters.get('rows', 0)} rows; div tables: {page.counters.get('course_div_tables', 0)}/{len(div_tables)}; "
+            f"{len(courses)} courses extracted"
+        )
         return courses
     
+    def _score_course_table(self, table, rows):
+        """Score how likely a table is a course catalog from its header and column shape
+        
+        Only the header row and a small sample of data rows are read, so layout
+        and navigation tables are rejected without scanning every row.
+        """
+        if len(rows) < 2:
+            return 0
+        
+        header = [cell.get_text(' ', strip=True).lower() for cell in rows[0].find_all(['td', 'th'])]
+        sample = [
+            [cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
+            for row in rows[1:1 + COURSE_TABLE_SAMPLE_ROWS]
+        ]
+        
+        # Header cells naming course fields
+        header_score = 0
+        for text in header:
+            words = set(HEADER_WORD_RE.findall(text))
+            header_score += max((weight for keyword, weight in COURSE_TABLE_HEADERS.items() if keyword in words), default=0)
+        score = min(header_score, 6)
+        
+        # Column shape: several data rows with a consistent number of columns
+        wide_rows = [cells for cells in sample if len(cells) >= 3]
+        if len(wide_rows) >= 2 or (len(wide_rows) == 1 and len(rows) == 2):
+            score += 1
+            if len({len(cells) for cells in wide_rows}) == 1 and len(wide_rows[0]) in (len(header), len(header) + 1):
+                score += 1
+        
+        # Data cells that look like course codes, row numbers, quarters or statuses
+        if wide_rows:
+            code_rows = sum(1 for cells in wide_rows if any(COURSE_CODE_RE.match(cell) for cell in cells[:2]))
+            if code_rows * 2 >= len(wide_rows):
+                score += 2
+            elif all(cells[0].isdigit() and cells[1] for cells in wide_rows):
+                score += 1
+            values = {cell.lower() for cells in wide_rows for cell in cells}
+            if values & {'fa', 'wi', 'sp', 'su'}:
+                score += 1
+            if values & {'online', 'on-campus', 'off-campus', 'open', 'closed', 'wait list'}:
+                score += 1
+        
+        # Tables that wrap other tables are page layout
+        if table.find('table'):
+            score -= 3
+        
+        return score
+    
     def _extract_courses_from_div_structure(self, div_element, base_url):
         """Extract courses from div-based table structures"""
         courses = []
         
         try:
             # Look for course items in div structures
-            course_items = div_element.find_all(['div', 'article'], class_=re.compile(r'course|item|row', re.I))
+            course_items = div_element.find_all(['div', 'article'], class_=DIV_ITEM_CLASS_RE)
             logger.info(f"Found {len(course_items)} course items in div structure")
             
             for item in course_items:
@@ -282,27 +1394,12 @@ class CourseExtractor:
     def _extract_course_from_div_item(self, div_item, base_url):
         """Extract course information from a div-based course item"""
         try:
-            course_info = {
-                'course_name': 'Not Available',
-                'institute_name': 'Not Available',
-                'location': 'Not Available',
-                'format': 'Not Available',
-                'faculty': 'Not Available',
-                'language': 'Not Available',
-                'dates': 'Not Available',
-                'duration': 'Not Available',
-                'suitable_for': 'Not Available',
-                'fees': 'Not Available',
-                'availability': 'Not Available'
-            }
+            course_info = self._empty_course()
             
             # Extract course name from various possible selectors
             name_selectors = ['h1', 'h2', 'h3', 'h4', '.course-title', '.course-name', '.title', '.name']
-            for selector in name_selectors:
-                name_elem = div_item.select_one(selector)
-                if name_elem and name_elem.get_text(strip=True):
-                    course_info['course_name'] = name_elem.get_text(strip=True)
-                    break
+            first = self._select_first(div_item, name_selectors)
+            course_info['course_name'] = self._first_text(first, name_selectors) or 'Not Available'
             
             # Extract other information from the div item
             item_text = div_item.get_text()
@@ -332,44 +1429,48 @@ class CourseExtractor:
         
         return None
     
-    def _extract_course_from_table_row(self, cells, base_url, table_context):
-        """Extract course information from a table row"""
+    def _table_schema(self, header_cells, table_context, adapter_columns=None):
+        """Build the column -> field mapping for a table once, from its header row
+        
+        Tables without a recognisable header fall back to the positional
+        Stanford (Code | Course Title | Qtr | Days | Format | Status) or LBS
+        (# | Course name | Duration | Course Fee | Close date | Details | Option)
+        layout, chosen per row from its already-read cell texts. A site adapter's
+        table_schema stands in for a header that names no title or code column.
+        """
+        labels = [' '.join(text.lower().split()).rstrip(':') for text in header_cells]
+        columns = {}
+        for index, label in enumerate(labels):
+            field = TABLE_HEADER_FIELDS.get(label)
+            if field is None:
+                words = set(HEADER_WORD_RE.findall(label))
+                field = next((f for f, keywords in TABLE_FIELD_KEYWORDS if words & keywords), None)
+            if field and field not in columns:
+                columns[field] = index
+        
+        if 'title' in columns or 'code' in columns:
+            return {'layout': 'header', 'columns': columns, 'labels': labels}
+        
+        if adapter_columns:
+            # The site adapter knows the layout; labels still filter repeated header rows
+            labels += [''] * (max(adapter_columns.values()) + 1 - len(labels))
+            return {'layout': 'header', 'columns': adapter_columns, 'labels': labels}
+        
+        # Table-wide part of the old per-row Stanford check
+        context = table_context.lower()
+        return {'layout': 'positional', 'stanford_context': 'stanford' in context or 'quarter' in context}
+    
+    def _extract_course_from_table_row(self, texts, schema):
+        """Extract course information from the cell texts of one table row"""
         try:
-            course_info = {
-                'course_name': 'Not Available',
-                'institute_name': 'Not Available',
-                'location': 'Not Available',
-                'format': 'Not Available',
-                'faculty': 'Not Available',
-                'language': 'Not Available',
-                'dates': 'Not Available',
-                'duration': 'Not Available',
-                'suitable_for': 'Not Available',
-                'fees': 'Not Available',
-                'availability': 'Not Available'
-            }
-            
-            # Detect table type based on context and cell content
-            is_stanford_format = (
-                'stanford' in table_context.lower() or 
-                'quarter' in table_context.lower() or
-                any(re.match(r'^[A-Z]{2,5}\s*\d+', cell.get_text(strip=True)) for cell in cells[:2] if len(cells) > 1) or  # Course codes like ARCH 03
-                any(cell.get_text(strip=True) in ['FA', 'WI', 'SP', 'SU'] for cell in cells if len(cells) > 2) or  # Quarter abbreviations
-                any('online' in cell.get_text(strip=True).lower() or 'on-campus' in cell.get_text(strip=True).lower() for cell in cells if len(cells) > 3)
-            )
-            
-            # Additional check: if first cell is just a number, it's likely LBS format (row numbers)
-            if len(cells) > 0 and cells[0].get_text(strip=True).isdigit():
-                is_stanford_format = False
-            
-            if is_stanford_format:
+            if schema['layout'] == 'header':
+                course_info = self._extract_row_by_header(texts, schema)
+            elif self._is_stanford_row(texts, schema):
                 # Stanford Continuing Studies format: Code | Course Title | Qtr | Days | Format | Status
-                logger.debug("Using Stanford format extraction")
-                course_info = self._extract_stanford_format(cells, course_info)
+                course_info = self._extract_stanford_format(texts, self._empty_course())
             else:
                 # LBS Centre Kerala format: # | Course name | Duration | Course Fee | Close date | Details | Option
-                logger.debug("Using LBS format extraction")
-                course_info = self._extract_lbs_format(cells, course_info)
+                course_info = self._extract_lbs_format(texts, self._empty_course())
             
             # Only return if we have at least a course name
             if course_info['course_name'] != 'Not Available':
@@ -380,33 +1481,97 @@ class CourseExtractor:
         
         return None
     
-    def _extract_stanford_format(self, cells, course_info):
+    @staticmethod
+    def _empty_course():
+        return {
+            'course_name': 'Not Available',
+            'institute_name': 'Not Available',
+            'location': 'Not Available',
+            'format': 'Not Available',
+            'faculty': 'Not Available',
+            'language': 'Not Available',
+            'dates': 'Not Available',
+            'duration': 'Not Available',
+            'suitable_for': 'Not Available',
+            'fees': 'Not Available',
+            'availability': 'Not Available'
+        }
+    
+    @staticmethod
+    def _is_stanford_row(texts, schema):
+        """Decide the positional layout of a row in a table without a usable header"""
+        # If first cell is just a number, it's likely LBS format (row numbers)
+        if texts and texts[0].isdigit():
+            return False
+        return (
+            schema['stanford_context'] or
+            (len(texts) > 1 and any(COURSE_CODE_RE.match(text) for text in texts[:2])) or  # Course codes like ARCH 03
+            (len(texts) > 2 and any(text in ('FA', 'WI', 'SP', 'SU') for text in texts)) or  # Quarter abbreviations
+            (len(texts) > 3 and any('online' in text.lower() or 'on-campus' in text.lower() for text in texts))
+        )
+    
+    def _extract_row_by_header(self, texts, schema):
+        """Extract a row using the column mapping built from the table header"""
+        columns = schema['columns']
+        labels = schema['labels']
+        
+        def value(field):
+            index = columns.get(field)
+            if index is None or index >= len(texts):
+                return ''
+            text = texts[index]
+            # Repeated header rows inside the body carry the labels themselves
+            return '' if text.lower() == labels[index] else text
+        
+        course_info = self._empty_course()
+        code, title = value('code'), value('title')
+        if code and title:
+            course_info['course_name'] = f"{code} - {title}"
+        elif title or code:
+            course_info['course_name'] = title or code
+        
+        quarter, days = value('quarter'), value('days')
+        if quarter and days:
+            course_info['dates'] = f"{quarter} ({days})"
+        elif quarter or days:
+            course_info['dates'] = quarter or days
+        elif value('dates'):
+            course_info['dates'] = value('dates')
+        elif value('close_date'):
+            course_info['dates'] = value('close_date')
+        
+        for field, key in [('format', 'format'), ('status', 'availability'), ('duration', 'duration'),
+                           ('fee', 'fees'), ('location', 'location'), ('instructor', 'faculty')]:
+            if value(field):
+                course_info[key] = value(field)
+        
+        if course_info['format'] == 'Not Available' and 'Apply Online' in value('option'):
+            course_info['format'] = 'Online Application Available'
+        
+        return course_info
+    
+    def _extract_stanford_format(self, texts, course_info):
         """Extract course information from Stanford Continuing Studies table format"""
         try:
             # Stanford format: Code | Course Title | Qtr | Days | Format | Status
-            logger.debug(f"Stanford format: Processing {len(cells)} cells")
+            logger.debug("Stanford format: Processing %d cells", len(texts))
             
-            if len(cells) >= 4:  # Need at least 4 columns for meaningful extraction
-                # Extract course code from first column
+            if len(texts) >= 4:  # Need at least 4 columns for meaningful extraction
+                # First cell might contain both code and title, or just code
                 course_code = ""
                 course_title = ""
+                first_cell_text = texts[0]
+                logger.debug("First cell: '%s'", first_cell_text)
                 
-                if len(cells) > 0:
-                    # First cell might contain both code and title, or just code
-                    first_cell_text = cells[0].get_text(strip=True)
-                    logger.debug(f"First cell: '{first_cell_text}'")
-                    
-                    # Check if first cell looks like a course code
-                    if re.match(r'^[A-Z]{2,5}\s*\d+', first_cell_text):
-                        course_code = first_cell_text
-                        
-                        # Extract course title from second column
-                        if len(cells) > 1:
-                            course_title = cells[1].get_text(strip=True)
-                            logger.debug(f"Second cell (title): '{course_title}'")
-                    else:
-                        # First cell might contain the title
-                        course_title = first_cell_text
+                # Check if first cell looks like a course code
+                if COURSE_CODE_RE.match(first_cell_text):
+                    course_code = first_cell_text
+                    # Extract course title from second column
+                    course_title = texts[1]
+                    logger.debug("Second cell (title): '%s'", course_title)
+                else:
+                    # First cell might contain the title
+                    course_title = first_cell_text
                 
                 # Set the course name
                 if course_code and course_title:
@@ -417,306 +1582,184 @@ class CourseExtractor:
                     course_info['course_name'] = course_code
                 
                 # Extract quarter from appropriate column (usually 3rd for Stanford)
-                if len(cells) > 2:
-                    quarter = cells[2].get_text(strip=True)
-                    logger.debug(f"Quarter cell: '{quarter}'")
-                    if quarter and quarter not in ['Qtr', ''] and re.match(r'^(FA|WI|SP|SU)$', quarter):
-                        course_info['dates'] = quarter
+                quarter = texts[2]
+                logger.debug("Quarter cell: '%s'", quarter)
+                if QUARTER_RE.match(quarter):
+                    course_info['dates'] = quarter
                 
                 # Extract days from appropriate column (usually 4th for Stanford)
-                if len(cells) > 3:
-                    days = cells[3].get_text(strip=True)
-                    logger.debug(f"Days cell: '{days}'")
-                    if days and days not in ['Days', '']:
-                        if course_info['dates'] != 'Not Available':
-                            course_info['dates'] += f" ({days})"
-                        else:
-                            course_info['dates'] = days
+                days = texts[3]
+                logger.debug("Days cell: '%s'", days)
+                if days and days != 'Days':
+                    if course_info['dates'] != 'Not Available':
+                        course_info['dates'] += f" ({days})"
+                    else:
+                        course_info['dates'] = days
                 
                 # Extract format from appropriate column (usually 5th for Stanford)
-                if len(cells) > 4:
-                    format_text = cells[4].get_text(strip=True)
-                    logger.debug(f"Format cell: '{format_text}'")
-                    if format_text and format_text not in ['Format', '']:
-                        course_info['format'] = format_text
+                if len(texts) > 4 and texts[4] not in ('Format', ''):
+                    course_info['format'] = texts[4]
                 
                 # Extract status from last column (usually 6th for Stanford)
-                if len(cells) > 5:
-                    status = cells[5].get_text(strip=True)
-                    logger.debug(f"Status cell: '{status}'")
-                    if status and status not in ['Status', '']:
-                        course_info['availability'] = status
+                if len(texts) > 5 and texts[5] not in ('Status', ''):
+                    course_info['availability'] = texts[5]
                         
-                logger.debug(f"Extracted Stanford course: {course_info['course_name']}")
+                logger.debug("Extracted Stanford course: %s", course_info['course_name'])
                         
         except Exception as e:
             logger.warning(f"Error extracting Stanford format: {e}")
         
         return course_info
     
-    def _extract_lbs_format(self, cells, course_info):
+    def _extract_lbs_format(self, texts, course_info):
         """Extract course information from LBS Centre Kerala table format"""
         try:
             # LBS Centre format: # | Course name | Duration | Course Fee | Close date | Details | Option
-            if len(cells) >= 5:
-                # Extract course name from second column (index 1)
-                course_name = cells[1].get_text(strip=True)
-                if course_name and course_name not in ['Course name', '']:
-                    course_info['course_name'] = course_name
-                
-                # Extract duration from third column (index 2)
-                if len(cells) > 2:
-                    duration = cells[2].get_text(strip=True)
-                    if duration and duration not in ['Duration', '']:
-                        course_info['duration'] = duration
-                
-                # Extract fees from fourth column (index 3)
-                if len(cells) > 3:
-                    fees = cells[3].get_text(strip=True)
-                    if fees and fees not in ['Course Fee', '']:
-                        course_info['fees'] = fees
-                
-                # Extract close date from fifth column (index 4)
-                if len(cells) > 4:
-                    close_date = cells[4].get_text(strip=True)
-                    if close_date and close_date not in ['Close date', '']:
-                        course_info['dates'] = close_date
+            if len(texts) >= 5:
+                if texts[1] not in ('Course name', ''):
+                    course_info['course_name'] = texts[1]
+                if texts[2] not in ('Duration', ''):
+                    course_info['duration'] = texts[2]
+                if texts[3] not in ('Course Fee', ''):
+                    course_info['fees'] = texts[3]
+                if texts[4] not in ('Close date', ''):
+                    course_info['dates'] = texts[4]
                 
                 # Extract format from the last column (usually contains "Apply Online")
-                if len(cells) > 5:
-                    format_text = cells[-1].get_text(strip=True)
-                    if format_text and 'Apply Online' in format_text:
-                        course_info['format'] = 'Online Application Available'
+                if len(texts) > 5 and 'Apply Online' in texts[-1]:
+                    course_info['format'] = 'Online Application Available'
                         
         except Exception as e:
             logger.warning(f"Error extracting LBS format: {e}")
         
         return course_info
     
+    @staticmethod
+    def _select_first(container, selectors):
+        """Find the first descendant matching each 'tag' or '.class' selector in a single walk
+        
+        Equivalent to calling container.select_one() per selector, without
+        re-traversing the container for every selector.
+        """
+        by_tag = {}
+        by_class = {}
+        for selector in selectors:
+            if selector.startswith('.'):
+                by_class.setdefault(selector[1:], []).append(selector)
+            else:
+                by_tag.setdefault(selector, []).append(selector)
+        
+        first = dict.fromkeys(selectors)
+        remaining = len(first)
+        for element in container.descendants:
+            if not isinstance(element, Tag):
+                continue
+            matched = list(by_tag.get(element.name, ()))
+            for class_name in element.get('class') or ():
+                matched.extend(by_class.get(class_name, ()))
+            for selector in matched:
+                if first[selector] is None:
+                    first[selector] = element
+                    remaining -= 1
+            if not remaining:
+                break
+        return first
+    
+    @staticmethod
+    def _first_text(first, selectors):
+        """Stripped text of the first selector (in order) whose element has any"""
+        for selector in selectors:
+            element = first.get(selector)
+            if element is not None:
+                text = element.get_text(strip=True)
+                if text:
+                    return text
+        return None
+    
     def _extract_single_course_from_container(self, container, base_url):
         """Extract information from a single course container"""
         try:
-            course_info = {
-                'course_name': 'Not Available',
-                'institute_name': 'Not Available',
-                'location': 'Not Available',
-                'format': 'Not Available',
-                'faculty': 'Not Available',
-                'language': 'Not Available',
-                'dates': 'Not Available',
-                'duration': 'Not Available',
-                'suitable_for': 'Not Available',
-                'fees': 'Not Available',
-                'availability': 'Not Available'
-            }
+            course_info = self._empty_course()
             
-            # Extract course name
+            # Find the elements for every selector-based field in one walk of the container
             name_selectors = ['h1', 'h2', 'h3', '.course-title', '.course-name', '.title']
-            for selector in name_selectors:
-                name_elem = container.select_one(selector)
-                if name_elem and name_elem.get_text(strip=True):
-                    course_info['course_name'] = name_elem.get_text(strip=True)
-                    break
+            institute_selectors = ['.institute', '.university', '.college', '.school', '.breadcrumb']
+            faculty_selectors = ['.faculty', '.instructor', '.teacher', '.professor']
+            first = self._select_first(container, name_selectors + institute_selectors + faculty_selectors + ['html'])
+            
+            # Extract course name
+            course_info['course_name'] = self._first_text(first, name_selectors) or 'Not Available'
             
             # Extract institute name (try to get from page title or breadcrumbs)
-            institute_selectors = ['.institute', '.university', '.college', '.school', '.breadcrumb']
-            for selector in institute_selectors:
-                institute_elem = container.select_one(selector)
-                if institute_elem and institute_elem.get_text(strip=True):
-                    course_info['institute_name'] = institute_elem.get_text(strip=True)
-                    break
+            course_info['institute_name'] = self._first_text(first, institute_selectors) or 'Not Available'
+            
+            container_text = container.get_text()
             
             # Fallback: try to extract from page content patterns
             if course_info['institute_name'] == 'Not Available':
                 # Look for common university patterns in the text
-                institute_patterns = [
-                    r'(Stanford\s+University)',
-                    r'(INSEAD)',
-                    r'(HEC\s+Paris)',
-                    r'(IMD\s+Business\s+School)',
-                    r'(LBS\s+Centre)',
-                    r'([A-Z][a-z]+\s+University)',
-                    r'([A-Z][a-z]+\s+College)',
-                    r'([A-Z][a-z]+\s+School)',
-                    r'(INSEAD\s+Business\s+School)',
-                    r'(INSEAD\s+Executive\s+Education)',
-                    r'(HEC\s+Paris\s+Business\s+School)',
-                    r'(IMD\s+Business\s+School)',
-                    r'(LBS\s+Centre,\s*Kerala)',
-                    r'(LBS\s+Centre\s+for\s+Science\s+&\s+Technology)',
-                    r'(LBS\s+Centre\s+for\s+Science\s+and\s+Technology)'
-                ]
-                
-                for pattern in institute_patterns:
-                    match = re.search(pattern, container_text, re.I)
-                    if match:
-                        course_info['institute_name'] = match.group(1).strip()
-                        break
+                match = PATTERNS['institute'].search(container_text)
+                if match:
+                    course_info['institute_name'] = match.group(1).strip()
             
             # Extract location
-            location_patterns = [
-                r'Location[:\s]+([^,\n]+)',
-                r'Address[:\s]+([^,\n]+)',
-                r'([A-Z][a-z]+,\s*[A-Z]{2})',
-                r'([A-Z][a-z]+,\s*[A-Z][a-z]+)'
-            ]
-            
-            container_text = container.get_text()
-            for pattern in location_patterns:
-                match = re.search(pattern, container_text, re.I)
-                if match:
-                    course_info['location'] = match.group(1).strip()
-                    break
+            match = PATTERNS['location'].search(container_text)
+            if match:
+                course_info['location'] = match.group(1).strip()
             
             # Fallback: try to extract from common university locations
             if course_info['location'] == 'Not Available':
-                location_fallbacks = [
-                    r'(Stanford,\s*CA)',
-                    r'(Stanford,\s*California)',
-                    r'(Fontainebleau,\s*France)',
-                    r'(Singapore)',
-                    r'(Abu\s+Dhabi)',
-                    r'(Lausanne,\s*Switzerland)',
-                    r'(Kerala,\s*India)',
-                    r'(Paris,\s*France)',
-                    r'(INSEAD\s+Fontainebleau)',
-                    r'(INSEAD\s+Singapore)',
-                    r'(INSEAD\s+Abu\s+Dhabi)',
-                    r'(HEC\s+Paris,\s*France)',
-                    r'(IMD\s+Lausanne)',
-                    r'(LBS\s+Centre,\s*Kerala)',
-                    r'(Thiruvananthapuram,\s*Kerala)',
-                    r'(Kerala,\s*India)',
-                    r'(India)'
-                ]
-                
-                for pattern in location_fallbacks:
-                    match = re.search(pattern, container_text, re.I)
-                    if match:
-                        course_info['location'] = match.group(1).strip()
-                        break
+                match = PATTERNS['location_fallback'].search(container_text)
+                if match:
+                    course_info['location'] = match.group(1).strip()
             
             # Extract format
-            format_patterns = [
-                r'(Online|On-campus|Hybrid|Distance|Remote)',
-                r'(Full-time|Part-time)',
-                r'(In-person|Virtual|Blended)'
-            ]
-            
-            for pattern in format_patterns:
-                match = re.search(pattern, container_text, re.I)
-                if match:
-                    course_info['format'] = match.group(1)
-                    break
+            match = PATTERNS['format'].search(container_text)
+            if match:
+                course_info['format'] = match.group(1)
             
             # Extract faculty/instructors
-            faculty_selectors = ['.faculty', '.instructor', '.teacher', '.professor']
-            for selector in faculty_selectors:
-                faculty_elem = container.select_one(selector)
-                if faculty_elem and faculty_elem.get_text(strip=True):
-                    course_info['faculty'] = faculty_elem.get_text(strip=True)
-                    break
+            course_info['faculty'] = self._first_text(first, faculty_selectors) or 'Not Available'
             
             # Extract language
-            language_patterns = [
-                r'Language[:\s]+([^,\n]+)',
-                r'Taught in[:\s]+([^,\n]+)',
-                r'([A-Z][a-z]+)\s+language'
-            ]
-            
-            for pattern in language_patterns:
-                match = re.search(pattern, container_text, re.I)
-                if match:
-                    course_info['language'] = match.group(1).strip()
-                    break
+            match = PATTERNS['language'].search(container_text)
+            if match:
+                course_info['language'] = match.group(1).strip()
             
             # Fallback for language: try html lang attribute
             if course_info['language'] == 'Not Available':
-                html_lang = container.find('html')
+                html_lang = first['html']
                 if html_lang and html_lang.get('lang'):
                     course_info['language'] = html_lang['lang'].split('-')[0].strip().capitalize()
             
             # Additional fallback: most university courses are in English
             if course_info['language'] == 'Not Available':
-                # Check if page content suggests English language
-                english_indicators = ['english', 'en', 'en-us', 'en-gb']
-                if any(indicator in container_text.lower() for indicator in english_indicators):
-                    course_info['language'] = 'English'
-                else:
-                    # Default to English for most university websites
-                    course_info['language'] = 'English'
+                course_info['language'] = 'English'
             
             # Extract dates
-            date_patterns = [
-                r'Start[:\s]+([^,\n]+)',
-                r'End[:\s]+([^,\n]+)',
-                r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-                r'(\w+\s+\d{1,2},?\s+\d{4})'
-            ]
-            
-            dates = []
-            for pattern in date_patterns:
-                matches = re.findall(pattern, container_text, re.I)
-                dates.extend(matches)
-            
+            dates = PATTERNS['dates'].findall(container_text)
             if dates:
                 course_info['dates'] = ' - '.join(dates[:2])  # Start and end dates
             
             # Extract duration
-            duration_patterns = [
-                r'Duration[:\s]+([^,\n]+)',
-                r'(\d+\s+(weeks?|months?|years?|days?))',
-                r'(\d+-\d+\s+(weeks?|months?|years?))'
-            ]
-            
-            for pattern in duration_patterns:
-                match = re.search(pattern, container_text, re.I)
-                if match:
-                    course_info['duration'] = match.group(1).strip()
-                    break
+            match = PATTERNS['duration'].search(container_text)
+            if match:
+                course_info['duration'] = match.group(1).strip()
             
             # Extract suitable for/prerequisites
-            suitable_patterns = [
-                r'Suitable for[:\s]+([^,\n]+)',
-                r'Prerequisites[:\s]+([^,\n]+)',
-                r'Target audience[:\s]+([^,\n]+)',
-                r'Requirements[:\s]+([^,\n]+)'
-            ]
-            
-            for pattern in suitable_patterns:
-                match = re.search(pattern, container_text, re.I)
-                if match:
-                    course_info['suitable_for'] = match.group(1).strip()
-                    break
+            match = PATTERNS['suitable_for'].search(container_text)
+            if match:
+                course_info['suitable_for'] = match.group(1).strip()
             
             # Extract fees
-            fee_patterns = [
-                r'Fee[:\s]+([^,\n]+)',
-                r'Cost[:\s]+([^,\n]+)',
-                r'Price[:\s]+([^,\n]+)',
-                r'(\$[\d,]+)',
-                r'(\d+[\d,]*\s*(USD|EUR|GBP|CAD))'
-            ]
-            
-            for pattern in fee_patterns:
-                match = re.search(pattern, container_text, re.I)
-                if match:
-                    course_info['fees'] = match.group(1).strip()
-                    break
+            match = PATTERNS['fees'].search(container_text)
+            if match:
+                course_info['fees'] = match.group(1).strip()
             
             # Extract availability
-            availability_patterns = [
-                r'Enrollment[:\s]+([^,\n]+)',
-                r'Status[:\s]+([^,\n]+)',
-                r'Availability[:\s]+([^,\n]+)',
-                r'(Open|Closed|Full|Available|Limited)'
-            ]
-            
-            for pattern in availability_patterns:
-                match = re.search(pattern, container_text, re.I)
-                if match:
-                    course_info['availability'] = match.group(1).strip()
-                    break
+            match = PATTERNS['availability'].search(container_text)
+            if match:
+                course_info['availability'] = match.group(1).strip()
             
             # Only return if we have at least a course name
             if course_info['course_name'] != 'Not Available':
@@ -727,168 +1770,270 @@ class CourseExtractor:
         
         return None
     
-    def _find_course_links(self, soup, base_url):
-        """Find links that might lead to course pages"""
-        course_links = []
-        base_netloc = urlparse(base_url).netloc
+    def _find_course_links(self, soup, base_url, page=None):
+        """Find links that might lead to course pages, most promising first
         
-        # Enhanced course keywords for executive education sites
-        course_keywords = [
-            'course', 'courses', 'class', 'program', 'programs', 'curriculum', 'syllabus', 
-            'training', 'workshop', 'executive', 'education', 'mba', 'mim', 'emba',
-            'certificate', 'diploma', 'degree', 'module', 'session', 'seminar'
-        ]
+        Links are ranked by _score_link; equal scores keep document order.
+        """
+        base_netloc = urlsplit(base_url).netloc
+        course_links = {}  # normalized URL -> [URL to fetch, best score]
         
-        # Look for links with course-related text or href
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-            link_text = link.get_text(strip=True).lower()
-            
-            # Check if link text OR href contains course keywords
-            href_lower = href.lower()
-            if any(keyword in link_text for keyword in course_keywords) or any(keyword in href_lower for keyword in course_keywords):
-                full_url = urljoin(base_url, href)
-                # Keep only same-domain links to avoid external noise
-                if urlparse(full_url).netloc == base_netloc:
-                    course_links.append(full_url)
-        
-        # Also look for navigation menus that might contain course links
-        nav_selectors = ['nav', '.navigation', '.menu', '.navbar', '.breadcrumb']
-        for selector in nav_selectors:
-            nav_elem = soup.select_one(selector)
-            if nav_elem:
-                nav_links = nav_elem.find_all('a', href=True)
-                for link in nav_links:
-                    href = link.get('href')
-                    link_text = link.get_text(strip=True).lower()
-                    href_lower = href.lower()
-                    
-                    if any(keyword in link_text for keyword in course_keywords) or any(keyword in href_lower for keyword in course_keywords):
-                        full_url = urljoin(base_url, href)
-                        if urlparse(full_url).netloc == base_netloc:
-                            course_links.append(full_url)
-        
-        # Look for Stanford-specific course patterns
-        if 'stanford' in base_url.lower():
-            # Look for course URLs in the page content
-            page_text = soup.get_text()
-            course_url_patterns = [
-                r'/courses/[^"\s]+',
-                r'/course/[^"\s]+',
-                r'/program/[^"\s]+'
-            ]
-            
-            for pattern in course_url_patterns:
-                matches = re.findall(pattern, page_text)
-                for match in matches:
-                    full_url = urljoin(base_url, match)
-                    if urlparse(full_url).netloc == base_netloc:
-                        course_links.append(full_url)
+        def add_link(href, score):
+            parts = urlsplit(urljoin(base_url, href))
+            # Keep only same-domain links to avoid external noise
+            if parts.netloc != base_netloc:
+                return
+            url, key = self._normalize_link(parts)
+            entry = course_links.setdefault(key, [url, score])
+            entry[1] = max(entry[1], score)
+        
+        adapter = page.adapter if page else site_adapter_for(base_url)
+        if adapter.link_selector:
+            # The adapter knows which anchors lead to course pages
+            for link in soup.select(adapter.link_selector):
+                if link.get('href'):
+                    add_link(link['href'], self._score_link(link, link['href'], link.get_text()))
+        else:
+            # Links with course-related href or text; nav menus are covered by the same scan
+            for link in soup.find_all('a', href=True):
+                href = link['href']
+                text = link.get_text()
+                if COURSE_LINK_RE.search(href) or COURSE_LINK_RE.search(text):
+                    add_link(href, self._score_link(link, href, text))
         
-        logger.info(f"Found {len(course_links)} potential course links")
-        return list(set(course_links))  # Remove duplicates
+        # Look for site-specific course URL patterns in the page content
+        if adapter.link_patterns:
+            page_text = page.text if page else soup.get_text()
+            for match in adapter.link_patterns.findall(page_text):
+                add_link(match, self._score_link(None, match, ''))
+        
+        ranked = sorted(course_links.values(), key=lambda entry: -entry[1])
+        logger.info(f"Found {len(ranked)} potential course links")
+        return [url for url, _ in ranked]
+    
+    @staticmethod
+    def _score_link(link, href, text):
+        """Score how likely a link is to lead to a course detail page"""
+        score = 0
+        if PATTERNS['course_url'].search(href):
+            score += LINK_SCORE_COURSE_PATH
+        elif COURSE_LINK_RE.search(href):
+            score += LINK_SCORE_HREF_KEYWORD
+        if COURSE_LINK_RE.search(text):
+            score += LINK_SCORE_TEXT_KEYWORD
+        # Site navigation repeats section links ("Education", "Executive") on every page
+        for parent in (link.parents if link is not None else ()):
+            if parent.name in NAV_TAGS or NAV_CLASS_RE.search(' '.join(parent.get('class') or ())):
+                score += LINK_SCORE_NAVIGATION
+                break
+        return score
+    
+    @staticmethod
+    def _normalize_link(parts):
+        """Return (URL to fetch, dedupe key) for a split URL
+        
+        The fragment and tracking parameters are dropped from both; the key also
+        ignores scheme/host case and a trailing slash on the path.
+        """
+        query = parts.query
+        if query:
+            params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+                      if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS]
+            query = urlencode(params)
+        url = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+        key = (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/') or '/', query)
+        return url, key
     
     def _extract_single_course(self, url, base_url):
         """Extract information from a single course page"""
         try:
-            response = self.session.get(url, timeout=10)
+            adapter = site_adapter_for(url)
+            response = self._get(url, timeout=10, headers=adapter.headers)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self._parse(response.content)
             
             # Create a virtual container with the entire page
             container = soup.find('body') or soup
             course = self._extract_single_course_from_container(container, base_url)
             if course:
-                course = self._apply_fallbacks(course, soup)
+                course = self._apply_fallbacks(course, PageContext(soup, url, adapter=adapter))
             return course
             
         except Exception as e:
             logger.warning(f"Failed to extract from {url}: {e}")
             return None
 
-    def _apply_fallbacks(self, course_info, soup):
-        """Apply page-level metadata fallbacks for missing fields"""
-        try:
-            # Institute fallback from og:site_name or title
-            if course_info.get('institute_name') in (None, '', 'Not Available'):
-                og_site = soup.find('meta', attrs={'property': 'og:site_name'})
-                if og_site and og_site.get('content'):
-                    course_info['institute_name'] = og_site['content'].strip()
-                elif soup.title and soup.title.get_text(strip=True):
-                    title_text = soup.title.get_text(strip=True)
-                    for sep in ['|', '–', '-', '—', '·']:
-                        if sep in title_text:
-                            title_text = title_text.split(sep)[0].strip()
-                            break
-                    course_info['institute_name'] = title_text
-
-            # Language fallback from html lang
-            if course_info.get('language') in (None, '', 'Not Available'):
-                html_tag = soup.find('html')
-                lang = html_tag.get('lang') if html_tag else None
-                if lang:
-                    course_info['language'] = lang
-        except Exception:
-            pass
-        return course_info
-
-    def _apply_page_metadata(self, course_info, soup, base_url):
-        """Apply page-level metadata to course information"""
+    def _page_head_metadata(self, page):
+        """Resolve site name and language once per document; reads only <title>, <meta> and <html>"""
+        if page.head_metadata is not None:
+            return page.head_metadata
+        
+        soup = page.soup
+        metadata = {'site_name': None, 'language': None}
         try:
-            # Extract institute name from page content
-            if course_info.get('institute_name') in (None, '', 'Not Available'):
-                page_text = soup.get_text()
-                institute_patterns = [
-                    r'(LBS\s+Centre\s+for\s+Science\s+&\s+Technology)',
-                    r'(LBS\s+Centre\s+for\s+Science\s+and\s+Technology)',
-                    r'(LBS\s+Centre)',
-                    r'(Stanford\s+University)',
-                    r'(INSEAD)',
-                    r'(HEC\s+Paris)',
-                    r'(IMD\s+Business\s+School)'
-                ]
-                
-                for pattern in institute_patterns:
-                    match = re.search(pattern, page_text, re.I)
-                    if match:
-                        course_info['institute_name'] = match.group(1).strip()
+            # Site name from og:site_name or title
+            og_site = soup.find('meta', attrs={'property': 'og:site_name'})
+            if og_site and og_site.get('content'):
+                metadata['site_name'] = og_site['content'].strip()
+            elif soup.title and soup.title.get_text(strip=True):
+                title_text = soup.title.get_text(strip=True)
+                for sep in ['|', '–', '-', '—', '·']:
+                    if sep in title_text:
+                        title_text = title_text.split(sep)[0].strip()
                         break
+                metadata['site_name'] = title_text
             
-            # Extract location from page content
-            if course_info.get('location') in (None, '', 'Not Available'):
-                page_text = soup.get_text()
-                location_patterns = [
-                    r'(Kerala,\s*India)',
-                    r'(Thiruvananthapuram,\s*Kerala)',
-                    r'(LBS\s+Centre,\s*Kerala)',
-                    r'(Stanford,\s*CA)',
-                    r'(Stanford,\s*California)',
-                    r'(Fontainebleau,\s*France)',
-                    r'(Singapore)',
-                    r'(Abu\s+Dhabi)',
-                    r'(Lausanne,\s*Switzerland)',
-                    r'(Paris,\s*France)'
-                ]
-                
-                for pattern in location_patterns:
-                    match = re.search(pattern, page_text, re.I)
-                    if match:
-                        course_info['location'] = match.group(1).strip()
-                        break
+            # Language from html lang
+            html_tag = soup.find('html')
+            metadata['language'] = html_tag.get('lang') if html_tag else None
+        except Exception as e:
+            logger.warning(f"Error reading page metadata: {e}")
+        
+        page.head_metadata = metadata
+        return metadata
+    
+    def _page_text_metadata(self, page):
+        """Resolve institute and location named in the page text once per document"""
+        if page.text_metadata is not None:
+            return page.text_metadata
+        
+        metadata = {'institute_name': None, 'location': None}
+        try:
+            match = PATTERNS['page_institute'].search(page.text)
+            if match:
+                metadata['institute_name'] = match.group(1).strip()
+            match = PATTERNS['page_location'].search(page.text)
+            if match:
+                metadata['location'] = match.group(1).strip()
+        except Exception as e:
+            logger.warning(f"Error reading page metadata: {e}")
+        
+        page.text_metadata = metadata
+        return metadata
+
+    def _apply_fallbacks(self, course_info, page):
+        """Apply page-level metadata fallbacks for missing fields"""
+        metadata = self._page_head_metadata(page)
+        
+        # Institute fallback from og:site_name or title
+        if course_info.get('institute_name') in (None, '', 'Not Available') and metadata['site_name']:
+            course_info['institute_name'] = metadata['site_name']
+        
+        # Language fallback from html lang
+        if course_info.get('language') in (None, '', 'Not Available') and metadata['language']:
+            course_info['language'] = metadata['language']
+        return course_info
+
+    def _apply_page_metadata(self, courses, page):
+        """Apply page-level metadata to a batch of courses from the same page"""
+        metadata = self._page_text_metadata(page)
+        
+        for course_info in courses:
+            # Institute and location named in the page content
+            if course_info.get('institute_name') in (None, '', 'Not Available') and metadata['institute_name']:
+                course_info['institute_name'] = metadata['institute_name']
+            if course_info.get('location') in (None, '', 'Not Available') and metadata['location']:
+                course_info['location'] = metadata['location']
             
             # Set default language for most university websites
             if course_info.get('language') in (None, '', 'Not Available'):
                 course_info['language'] = 'English'
-                
-        except Exception as e:
-            logger.warning(f"Error applying page metadata: {e}")
         
-        return course_info
+        return courses
 
 # Initialize the extractor
 extractor = CourseExtractor()
 
+# Limits for processing the URLs of a single extraction request
+EXTRACT_MAX_PARALLEL = max(1, int(os.getenv('EXTRACT_MAX_PARALLEL', '4')))
+EXTRACT_DEADLINE = float(os.getenv('EXTRACT_DEADLINE', '120'))
+
+def _timed_extract(url, on_course=None, trace=False, cancel=None):
+    """Run an extraction and record how long it took"""
+    started = time.monotonic()
+    result = extractor.extract_course_info(url, on_course, trace, cancel)
+    result['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return result
+
+def iter_extractions(urls, max_parallel, deadline, on_course=None, trace=False):
+    """Extract several URLs in parallel, yielding (index, result) as each finishes.
+    
+    URLs that have not finished when the deadline expires are yielded as
+    timed out, with the courses extracted from them so far; their workers
+    are cancelled and only finish the pages they are already fetching. If
+    on_course is given it is called as on_course(index, course) for every
+    course as soon as it is extracted.
+    """
+    started = time.monotonic()
+    gathered = [[] for _ in urls]
+    timed_out = set()
+    lock = threading.Lock()
+    
+    def collect(index, course):
+        with lock:
+            # A URL reported as timed out is closed: what was passed on is what it returned
+            if index in timed_out:
+                return
+            gathered[index].append(course)
+            if on_course:
+                on_course(index, course)
+    
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(urls))))
+    futures = {
+        pool.submit(_timed_extract, url, partial(collect, index), trace, cancel): index
+        for index, url in enumerate(urls)
+    }
+    pending = set(futures)
+    
+    def outcome(future):
+        index = futures[future]
+        try:
+            return index, future.result()
+        except Exception as e:
+            return index, {'success': False, 'url': urls[index], 'error': f"Unexpected error: {str(e)}"}
+    
+    try:
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                pending.discard(future)
+                yield outcome(future)
+        except FuturesTimeoutError:
+            for future in sorted(pending, key=futures.get):
+                if future.done() and not future.cancelled():
+                    yield outcome(future)
+                    continue
+                index = futures[future]
+                with lock:
+                    timed_out.add(index)
+                    courses = list(gathered[index])
+                logger.warning(f"Extraction of {urls[index]} did not finish within {deadline}s ({len(courses)} courses so far)")
+                # Partial results count as a success so totals, jobs and exports include them
+                yield index, {
+                    'success': bool(courses),
+                    'url': urls[index],
+                    'timed_out': True,
+                    'error': f"Extraction did not finish within {deadline} seconds",
+                    'courses_found': len(courses),
+                    'courses': courses,
+                    'elapsed_seconds': round(time.monotonic() - started, 3)
+                }
+    finally:
+        # Stop unfinished extractions from fetching more pages once nobody waits for them
+        cancel.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def extract_urls(urls, max_parallel=None, deadline=None, trace=False):
+    """Extract several URLs in parallel, returning results in input order"""
+    max_parallel = min(max_parallel or EXTRACT_MAX_PARALLEL, EXTRACT_MAX_PARALLEL)
+    deadline = min(deadline or EXTRACT_DEADLINE, EXTRACT_DEADLINE)
+    
+    results = [None] * len(urls)
+    for index, result in iter_extractions(urls, max_parallel, deadline, trace=trace):
+        results[index] = result
+    return results
+
 @app.route('/api/extract', methods=['POST'])
 def extract_courses():
     """Extract course information from provided URLs"""
@@ -899,16 +2044,17 @@ def extract_courses():
         if not urls:
             return jsonify({'error': 'No URLs provided'}), 400
         
-        results = []
-        for url in urls:
-            if url.strip():
-                result = extractor.extract_course_info(url.strip())
-                results.append(result)
+        started = time.monotonic()
+        urls = [url.strip() for url in urls if url.strip()]
+        results = extract_urls(urls, data.get('max_parallel'), data.get('deadline'), bool(data.get('trace')))
         
         response = jsonify({
             'success': True,
             'results': results,
-            'total_courses': sum(len(r.get('courses', [])) for r in results if r.get('success'))
+            'result_id': store_results(urls, results),
+            'total_courses': sum(len(r.get('courses', [])) for r in results if r.get('success')),
+            'timed_out': sum(1 for r in results if r.get('timed_out')),
+            'elapsed_seconds': round(time.monotonic() - started, 3)
         })
         return response
         
@@ -917,117 +2063,475 @@ def extract_courses():
         error_response = jsonify({'error': str(e)})
         return error_response, 500
 
+@app.route('/api/extract/stream', methods=['POST'])
+def extract_courses_stream():
+    """Stream extracted courses as NDJSON events while the URLs are processed"""
+    try:
+        data = request.get_json()
+        urls = [url.strip() for url in data.get('urls', []) if url.strip()]
+        
+        if not urls:
+            return jsonify({'error': 'No URLs provided'}), 400
+        
+        max_parallel = min(data.get('max_parallel') or EXTRACT_MAX_PARALLEL, EXTRACT_MAX_PARALLEL)
+        deadline = min(data.get('deadline') or EXTRACT_DEADLINE, EXTRACT_DEADLINE)
+        trace = bool(data.get('trace'))
+        
+    except Exception as e:
+        logger.error(f"Error in extract stream endpoint: {e}")
+        error_response = jsonify({'error': str(e)})
+        return error_response, 500
+    
+    events = queue.Queue()
+    finished = object()
+    
+    def on_course(index, course):
+        events.put({'type': 'course', 'index': index, 'url': urls[index], 'course': course})
+    
+    def produce():
+        # Runs in its own thread so courses reach the client while workers are still busy
+        started = time.monotonic()
+        total_courses = 0
+        results = [None] * len(urls)
+        result_id = None
+        try:
+            for index, result in iter_extractions(urls, max_parallel, deadline, on_course, trace):
+                results[index] = result
+                event = {key: value for key, value in result.items() if key != 'courses'}
+                event.update(type='url_done', index=index)
+                events.put(event)
+                if result.get('success'):
+                    total_courses += len(result.get('courses', []))
+            result_id = store_results(urls, results)
+        except Exception as e:
+            logger.error(f"Error while streaming extraction: {e}")
+            events.put({'type': 'error', 'error': str(e)})
+        events.put({
+            'type': 'done',
+            'total_courses': total_courses,
+            'result_id': result_id,
+            'elapsed_seconds': round(time.monotonic() - started, 3)
+        })
+        events.put(finished)
+    
+    def generate():
+        while True:
+            event = events.get()
+            if event is finished:
+                return
+            yield json.dumps(event) + '\n'
+    
+    threading.Thread(target=produce, daemon=True).start()
+    return Response(generate(), mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
+
+class MemoryJobStore:
+    """Keeps extraction jobs in process memory
+    
+    A job is a small progress record plus an append-only list of results, so
+    recording a finished URL or answering a status poll never copies the
+    results gathered so far.
+    """
+    
+    def __init__(self):
+        self._jobs = {}
+        self._results = {}
+        self._lock = threading.Lock()
+    
+    def save(self, job, results=()):
+        with self._lock:
+            self._jobs[job['id']] = json.loads(json.dumps(job))
+            self._results[job['id']] = [json.loads(json.dumps(result)) for result in results]
+    
+    def load(self, job_id):
+        """Return the job's progress record (without results)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+    
+    def update(self, job_id, mutate):
+        """Apply mutate(job) to the progress record atomically and return the updated record"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            mutate(job)
+            job['updated_at'] = datetime.now().isoformat()
+            return json.loads(json.dumps(job))
+    
+    def append_result(self, job_id, result):
+        with self._lock:
+            if job_id in self._results:
+                self._results[job_id].append(json.loads(json.dumps(result)))
+    
+    def results(self, job_id, offset=0):
+        """Return the job's results from offset on, or None for an unknown job"""
+        with self._lock:
+            results = self._results.get(job_id)
+            return results[offset:] if results is not None else None
+    
+    def purge(self, older_than):
+        with self._lock:
+            for job_id in [k for k, job in self._jobs.items() if job['created_ts'] < older_than]:
+                del self._jobs[job_id]
+                self._results.pop(job_id, None)
+
+
+class DirectoryJobStore(MemoryJobStore):
+    """Keeps extraction jobs as files so every worker process can read them
+    
+    <id>.json holds the progress record and <id>.results.jsonl gets one line
+    appended per finished result.
+    """
+    
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+    
+    def _results_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.results.jsonl')
+    
+    def _write(self, job):
+        temp_path = self._path(job['id']) + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f)
+        os.replace(temp_path, self._path(job['id']))
+    
+    def _read(self, job_id):
+        try:
+            with open(self._path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save(self, job, results=()):
+        with self._lock:
+            with open(self._results_path(job['id']), 'w', encoding='utf-8') as f:
+                for result in results:
+                    f.write(json.dumps(result) + '\n')
+            self._write(job)
+    
+    def load(self, job_id):
+        with self._lock:
+            return self._read(job_id)
+    
+    def update(self, job_id, mutate):
+        with self._lock:
+            job = self._read(job_id)
+            if job is None:
+                return None
+            mutate(job)
+            job['updated_at'] = datetime.now().isoformat()
+            self._write(job)
+            return job
+    
+    def append_result(self, job_id, result):
+        with self._lock:
+            with open(self._results_path(job_id), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result) + '\n')
+    
+    def results(self, job_id, offset=0):
+        try:
+            with open(self._results_path(job_id), encoding='utf-8') as f:
+                return [json.loads(line) for index, line in enumerate(f) if index >= offset and line.strip()]
+        except OSError:
+            return None
+    
+    def purge(self, older_than):
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                job_id = name[:-len('.json')]
+                job = self._read(job_id)
+                if job is None or job['created_ts'] < older_than:
+                    for path in (self._path(job_id), self._results_path(job_id)):
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+
+
+def create_job_store():
+    """Build the job store selected by JOB_STORE_DIR (memory when unset)"""
+    directory = os.getenv('JOB_STORE_DIR')
+    if directory:
+        return DirectoryJobStore(directory)
+    return MemoryJobStore()
+
+# Background extraction jobs
+JOB_WORKERS = max(1, int(os.getenv('JOB_WORKERS', '2')))
+JOB_DEADLINE = float(os.getenv('JOB_DEADLINE', '3600'))
+JOB_TTL = float(os.getenv('JOB_TTL', '3600'))
+# Job and result ids are uuid4 hex (see _new_job); anything else never reaches a store
+JOB_ID_RE = re.compile(r'[0-9a-f]{32}')
+job_store = create_job_store()
+# Results of /api/extract and the stream, kept for exports by id; on disk by default so
+# every worker can serve them and they don't sit in worker memory (empty RESULT_STORE_DIR keeps them in memory)
+RESULT_STORE_DIR = os.getenv('RESULT_STORE_DIR', os.getenv('JOB_STORE_DIR') or os.path.join(tempfile.gettempdir(), 'course_extractor_results'))
+result_store = DirectoryJobStore(RESULT_STORE_DIR) if RESULT_STORE_DIR else MemoryJobStore()
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS)
+
+def _new_job(urls, status='queued', max_parallel=EXTRACT_MAX_PARALLEL, trace=False):
+    """Build a job record for the given URLs"""
+    now = datetime.now().isoformat()
+    return {
+        'id': uuid.uuid4().hex,
+        'status': status,
+        'created_at': now,
+        'updated_at': now,
+        'created_ts': time.time(),
+        'urls': urls,
+        'max_parallel': max_parallel,
+        'trace': trace,
+        'total_urls': len(urls),
+        'urls_done': 0,
+        'courses_found': 0,
+        'errors': []
+    }
+
+def store_results(urls, results):
+    """Keep finished extraction results as a completed job so exports can refer to them by id"""
+    result_store.purge(time.time() - JOB_TTL)
+    job = _new_job(urls, status='completed')
+    job.update(
+        urls_done=len(results),
+        courses_found=sum(len(r.get('courses', [])) for r in results if r.get('success')),
+        errors=[{'url': r.get('url'), 'error': r.get('error')} for r in results if r.get('error')]
+    )
+    result_store.save(job, results)
+    return job['id']
+
+def export_results(data):
+    """Return (results, error response) for an export request
+    
+    The request names stored results by "result_id" (or a job's id) or posts
+    them in "results".
+    """
+    result_id = data.get('result_id')
+    if result_id:
+        if not isinstance(result_id, str) or not JOB_ID_RE.fullmatch(result_id):
+            return None, (jsonify({'error': 'Invalid result_id'}), 400)
+        for store in (result_store, job_store):
+            job = store.load(result_id)
+            if job and job['created_ts'] >= time.time() - JOB_TTL:
+                results = store.results(result_id)
+                if results is not None:
+                    return results, None
+        return None, (jsonify({'error': 'Results not found or expired'}), 404)
+    return data.get('results', []), None
+
+def _job_summary(job):
+    """Progress fields of a job"""
+    return {key: value for key, value in job.items() if key != 'created_ts'}
+
+def _run_job(job_id):
+    """Process the URLs of a queued job, recording each result as it finishes"""
+    job = job_store.update(job_id, lambda j: j.update(status='running'))
+    if job is None:
+        return
+    
+    def record(result):
+        def mutate(j):
+            j['urls_done'] += 1
+            if result.get('success'):
+                j['courses_found'] += len(result.get('courses', []))
+            if result.get('error'):
+                j['errors'].append({'url': result.get('url'), 'error': result.get('error')})
+        return mutate
+    
+    try:
+        for _, result in iter_extractions(job['urls'], job['max_parallel'], JOB_DEADLINE, trace=job['trace']):
+            job_store.append_result(job_id, result)
+            job_store.update(job_id, record(result))
+        job_store.update(job_id, lambda j: j.update(status='completed'))
+    except Exception as e:
+        error = str(e)
+        logger.error(f"Job {job_id} failed: {error}")
+        job_store.update(job_id, lambda j: j.update(status='failed', error=error))
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Queue an extraction job and return its id immediately"""
+    try:
+        data = request.get_json()
+        urls = [url.strip() for url in data.get('urls', []) if url.strip()]
+        
+        if not urls:
+            return jsonify({'error': 'No URLs provided'}), 400
+        
+        job_store.purge(time.time() - JOB_TTL)
+        job = _new_job(
+            urls,
+            max_parallel=min(data.get('max_parallel') or EXTRACT_MAX_PARALLEL, EXTRACT_MAX_PARALLEL),
+            trace=bool(data.get('trace'))
+        )
+        job_store.save(job)
+        job_executor.submit(_run_job, job['id'])
+        
+        response = jsonify(_job_summary(job))
+        return response, 202
+        
+    except Exception as e:
+        logger.error(f"Error creating job: {e}")
+        error_response = jsonify({'error': str(e)})
+        return error_response, 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Report the progress of an extraction job"""
+    job = job_store.load(job_id) if JOB_ID_RE.fullmatch(job_id) else None
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_summary(job))
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    """Return job results finished since the given offset"""
+    job = job_store.load(job_id) if JOB_ID_RE.fullmatch(job_id) else None
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    offset = max(0, request.args.get('offset', 0, type=int))
+    results = job_store.results(job_id, offset) or []
+    response = jsonify({
+        'id': job['id'],
+        'status': job['status'],
+        'offset': offset,
+        'next_offset': offset + len(results),
+        'results': results
+    })
+    return response
+
+# Course fields written by the exports, in column order
+EXPORT_FIELDS = [
+    'course_name', 'institute_name', 'location', 'format', 'faculty',
+    'language', 'dates', 'duration', 'suitable_for', 'fees', 'availability',
+    'source_url'
+]
+
+def iter_export_courses(results):
+    """Yield the courses of successful results, each tagged with its source URL"""
+    for result in results:
+        if result.get('success') and result.get('courses'):
+            for course in result['courses']:
+                course['source_url'] = result['url']
+                yield course
+
+def iter_csv(courses):
+    """Yield CSV text one row at a time; only the current row is ever buffered"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for course in courses:
+        # Ensure all expected fields exist
+        writer.writerow({key: course.get(key, 'Not Available') for key in EXPORT_FIELDS})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
 @app.route('/api/export/csv', methods=['POST'])
 def export_csv():
-    """Export extracted course data to CSV"""
+    """Export extracted course data to CSV, streamed as it is written"""
     try:
         data = request.get_json()
-        results = data.get('results', [])
+        results, error = export_results(data)
+        if error:
+            return error
         
         if not results:
             return jsonify({'error': 'No data to export'}), 400
         
-        # Flatten all courses into a single list
-        all_courses = []
-        for result in results:
-            if result.get('success') and result.get('courses'):
-                for course in result['courses']:
-                    course['source_url'] = result['url']
-                    all_courses.append(course)
-        
-        if not all_courses:
+        courses = iter_export_courses(results)
+        first = next(courses, None)
+        if first is None:
             return jsonify({'error': 'No courses found to export'}), 400
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'courses_export_{timestamp}.csv'
         
-        # Save to temporary CSV file
-        temp_path = f'temp_{filename}'
-        fieldnames = [
-            'course_name', 'institute_name', 'location', 'format', 'faculty',
-            'language', 'dates', 'duration', 'suitable_for', 'fees', 'availability',
-            'source_url'
-        ]
-        with open(temp_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for course in all_courses:
-                # Ensure all expected fields exist
-                row = {key: course.get(key, 'Not Available') for key in fieldnames}
-                writer.writerow(row)
-        
-        # Send file
-        response = send_file(temp_path, as_attachment=True, download_name=filename)
-        
-        # Clean up temporary file after sending
-        @response.call_on_close
-        def cleanup():
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-        
-        return response
+        rows = iter_csv(chain([first], courses))
+        return Response(
+            (row.encode('utf-8') for row in rows),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
         
     except Exception as e:
         logger.error(f"Error in CSV export: {e}")
         error_response = jsonify({'error': str(e)})
         return error_response, 500
 
+# Exports up to this size stay in memory; larger workbooks spill to a temp file
+EXPORT_SPOOL_BYTES = int(os.getenv('EXPORT_SPOOL_BYTES', str(10 * 1024 * 1024)))
+# Characters Excel does not allow in sheet titles
+SHEET_TITLE_INVALID_RE = re.compile(r'[\[\]:*?/\\]')
+
+def _sheet_title(url, used):
+    """Return a unique, valid (<= 31 chars) worksheet title for a source URL"""
+    parts = urlparse(url)
+    base = SHEET_TITLE_INVALID_RE.sub('_', (parts.netloc + parts.path).rstrip('/'))[:31] or 'Courses'
+    title, n = base, 2
+    while title.lower() in used:
+        suffix = f' ({n})'
+        title, n = base[:31 - len(suffix)] + suffix, n + 1
+    used.add(title.lower())
+    return title
+
 @app.route('/api/export/excel', methods=['POST'])
 def export_excel():
-    """Export extracted course data to Excel"""
+    """Export extracted course data to Excel
+    
+    The workbook is written in openpyxl's write-only mode, so rows are not kept
+    as cell objects. Pass "sheet_per_url": true for one worksheet per source URL.
+    """
     try:
         data = request.get_json()
-        results = data.get('results', [])
+        results, error = export_results(data)
+        if error:
+            return error
         
         if not results:
             return jsonify({'error': 'No data to export'}), 400
         
-        # Flatten all courses into a single list
-        all_courses = []
-        for result in results:
-            if result.get('success') and result.get('courses'):
-                for course in result['courses']:
-                    course['source_url'] = result['url']
-                    all_courses.append(course)
-        
-        if not all_courses:
+        courses = iter_export_courses(results)
+        first = next(courses, None)
+        if first is None:
             return jsonify({'error': 'No courses found to export'}), 400
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'courses_export_{timestamp}.xlsx'
         
-        # Save to temporary Excel file using openpyxl
-        temp_path = f'temp_{filename}'
-        headers = [
-            'course_name', 'institute_name', 'location', 'format', 'faculty',
-            'language', 'dates', 'duration', 'suitable_for', 'fees', 'availability',
-            'source_url'
-        ]
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Courses'
-        ws.append([h.replace('_', ' ').title() for h in headers])
-        for course in all_courses:
-            row = [course.get(h, 'Not Available') for h in headers]
-            ws.append(row)
-        wb.save(temp_path)
-        
-        # Send file
-        response = send_file(temp_path, as_attachment=True, download_name=filename)
-        
-        # Clean up temporary file after sending
-        @response.call_on_close
-        def cleanup():
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+        header = [h.replace('_', ' ').title() for h in EXPORT_FIELDS]
+        wb = Workbook(write_only=True)
+        sheets = {}  # source URL (or None for a single sheet) -> worksheet
+        used_titles = set()
+        sheet_per_url = bool(data.get('sheet_per_url'))
+        for course in chain([first], courses):
+            key = course['source_url'] if sheet_per_url else None
+            ws = sheets.get(key)
+            if ws is None:
+                ws = wb.create_sheet(_sheet_title(key, used_titles) if key else 'Courses')
+                ws.append(header)
+                sheets[key] = ws
+            ws.append([course.get(h, 'Not Available') for h in EXPORT_FIELDS])
         
-        return response
+        buffer = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        wb.save(buffer)
+        buffer.seek(0)
+        
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name=filename,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
         
     except Exception as e:
         logger.error(f"Error in Excel export: {e}")
@@ -1045,6 +2549,12 @@ def service_worker():
     response = send_from_directory('static', 'sw.js')
     return response
 
+@app.route('/api/stats/patterns', methods=['GET'])
+def pattern_statistics():
+    """Report how often each extraction pattern was tried and matched"""
+    response = jsonify(pattern_stats())
+    return response
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Parser benchmark for Course Extractor
+Compares parse time, memory and extraction time of the HTML parser backends
+on saved catalog pages.
+
+Usage:
+    python benchmark_parsers.py page.html [more.html ...] [--runs N]
+    python benchmark_parsers.py https://example.edu/courses --runs 3
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+from app import CourseExtractor, GENERIC_ADAPTER
+
+# BeautifulSoup backends the extractor can use, the partial listing parse, and raw lxml.html as a reference
+BACKENDS = ['html.parser', 'lxml', 'lxml (partial listing parse)', 'lxml.html (no BeautifulSoup)']
+PARTIAL = 'lxml (partial listing parse)'
+
+
+def load_page(source, extractor):
+    """Read a saved page from disk, or download it once if given a URL"""
+    if source.startswith(('http://', 'https://')):
+        response = extractor.sessions.session_for(source).get(source, timeout=15)
+        response.raise_for_status()
+        return response.content
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def parse(backend, content, extractor=None):
+    if backend.startswith('lxml.html'):
+        import lxml.html
+        return lxml.html.fromstring(content)
+    if backend == PARTIAL:
+        extractor.parser = 'lxml'
+        return extractor._parse_listing(content, GENERIC_ADAPTER)
+    return BeautifulSoup(content, backend)
+
+
+def measure(backend, content, runs, extractor):
+    """Return (mean parse seconds, peak parse memory in bytes)
+
+    tracemalloc only sees the Python heap, so the raw lxml tree (allocated in C)
+    reports close to zero.
+    """
+    started = time.perf_counter()
+    for _ in range(runs):
+        parse(backend, content, extractor)
+    elapsed = (time.perf_counter() - started) / runs
+
+    tracemalloc.start()
+    parse(backend, content, extractor)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def measure_extraction(extractor, backend, content, source, runs):
+    """Return (mean seconds to parse and extract, courses found)"""
+    if backend.startswith('lxml.html'):
+        return None, None
+    courses = []
+    started = time.perf_counter()
+    for _ in range(runs):
+        if backend != PARTIAL:
+            extractor.parser = backend
+        courses = extractor._extract_courses_from_page(parse(backend, content, extractor), source)
+    return (time.perf_counter() - started) / runs, len(courses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends on catalog pages')
+    parser.add_argument('pages', nargs='+', help='saved .html files or URLs')
+    parser.add_argument('--runs', type=int, default=5, help='iterations per measurement')
+    args = parser.parse_args()
+
+    # Extraction logs would dominate the timings
+    logging.disable(logging.CRITICAL)
+    extractor = CourseExtractor()
+
+    print("⏱️  Course Extractor Parser Benchmark")
+    print("=" * 78)
+    print(f"{'Backend':<30} {'Parse ms':>10} {'Peak MB':>10} {'Extract ms':>12} {'Courses':>8}")
+
+    for source in args.pages:
+        content = load_page(source, extractor)
+        print("-" * 78)
+        print(f"📄 {source} ({len(content) / 1024:.0f} KB)")
+        for backend in BACKENDS:
+            parse_time, peak = measure(backend, content, args.runs, extractor)
+            extract_time, courses = measure_extraction(extractor, backend, content, source, args.runs)
+            extract_col = f"{extract_time * 1000:>12.1f}" if extract_time is not None else f"{'-':>12}"
+            courses_col = f"{courses:>8}" if courses is not None else f"{'-':>8}"
+            print(f"{backend:<30} {parse_time * 1000:>10.1f} {peak / 1024 / 1024:>10.2f} {extract_col} {courses_col}")
+
+
+if __name__ == '__main__':
+    main()
@@ -164,9 +164,10 @@ class CourseExtractorApp {
 
         // Show loading modal
         this.showLoadingModal();
+        this.startStreamingResults(urls);
 
         try {
-            const response = await fetch('/api/extract', {
+            const response = await fetch('/api/extract/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -174,13 +175,14 @@ class CourseExtractorApp {
                 body: JSON.stringify({ urls: urls })
             });
 
-            const data = await response.json();
-
-            if (response.ok) {
-                this.handleExtractionSuccess(data);
-            } else {
+            if (!response.ok) {
+                const data = await response.json();
                 this.showError(data.error || 'Failed to extract courses');
+                return;
             }
+
+            await this.readEventStream(response, (event) => this.handleStreamEvent(event));
+            this.handleExtractionSuccess(this.currentResults, true);
         } catch (error) {
             console.error('Extraction error:', error);
             this.showError('Network error. Please check your connection and try again.');
@@ -189,14 +191,79 @@ class CourseExtractorApp {
         }
     }
 
-    handleExtractionSuccess(data) {
+    async readEventStream(response, onEvent) {
+        // The stream endpoint sends one JSON object per line
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => onEvent(JSON.parse(line)));
+
+            if (done) break;
+        }
+
+        if (buffer.trim()) {
+            onEvent(JSON.parse(buffer));
+        }
+    }
+
+    startStreamingResults(urls) {
+        this.currentResults = {
+            success: true,
+            results: urls.map(url => ({ success: false, url: url, courses_found: 0, courses: [] })),
+            total_courses: 0
+        };
+
+        document.getElementById('resultsTableBody').innerHTML = '';
+        document.getElementById('noResultsMessage').style.display = 'none';
+        this.updateStatistics(this.currentResults);
+    }
+
+    handleStreamEvent(event) {
+        const results = this.currentResults.results;
+
+        if (event.type === 'course') {
+            const result = results[event.index];
+            result.courses.push(event.course);
+            result.courses_found = result.courses.length;
+            this.currentResults.total_courses += 1;
+
+            // Show rows as soon as the first course arrives
+            if (this.currentResults.total_courses === 1) {
+                this.hideLoadingModal();
+                document.getElementById('results').style.display = 'block';
+            }
+            document.getElementById('resultsTableBody').appendChild(this.createCourseRow(event.course, event.url));
+            this.updateStatistics(this.currentResults);
+        } else if (event.type === 'url_done') {
+            const { type, index, ...result } = event;
+            results[index] = { ...results[index], ...result };
+        } else if (event.type === 'done') {
+            this.currentResults.total_courses = event.total_courses;
+            this.currentResults.result_id = event.result_id;
+        } else if (event.type === 'error') {
+            console.error('Extraction stream error:', event.error);
+        }
+    }
+
+    handleExtractionSuccess(data, rendered = false) {
         this.currentResults = data;
         
         // Update statistics
         this.updateStatistics(data);
         
-        // Display results
-        this.displayResults(data);
+        // Display results (streamed rows are already in the table)
+        if (rendered && data.total_courses > 0) {
+            document.getElementById('noResultsMessage').style.display = 'none';
+        } else {
+            this.displayResults(data);
+        }
         
         // Add to history
         this.addToHistory(data);
@@ -440,6 +507,16 @@ class CourseExtractorApp {
         await this.extractCourses();
     }
 
+    requestExport(format, body) {
+        return fetch(`/api/export/${format}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(body)
+        });
+    }
+
     async exportData(format) {
         if (!this.currentResults) {
             this.showError('No data to export. Please extract courses first.');
@@ -447,13 +524,13 @@ class CourseExtractorApp {
         }
 
         try {
-            const response = await fetch(`/api/export/${format}`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({ results: this.currentResults.results })
-            });
+            const { result_id, results } = this.currentResults;
+            // Results kept on the server are exported by id; re-upload the ones shown here
+            // if the stored copy expired (404) or was rejected (400)
+            let response = result_id ? await this.requestExport(format, { result_id }) : null;
+            if (!response || response.status === 400 || response.status === 404) {
+                response = await this.requestExport(format, { results });
+            }
 
             if (response.ok) {
                 const blob = await response.blob();
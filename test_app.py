@@ -6,6 +6,9 @@ Simple test script for Course Extractor application
 import requests
 import json
 import time
+import threading
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 
 def test_health_endpoint():
     """Test the health check endpoint"""
@@ -64,6 +67,208 @@ def test_extraction_endpoint():
         print(f"❌ Request failed: {e}")
         return False
 
+def test_jobs_endpoint():
+    """Test queuing an extraction job and polling it to completion"""
+    test_url = "https://www.coursera.org/courses"
+    
+    try:
+        response = requests.post('http://localhost:5000/api/jobs', json={"urls": [test_url]})
+        if response.status_code != 202:
+            print(f"❌ Job creation failed: {response.status_code}")
+            return False
+        
+        job_id = response.json()['id']
+        print(f"🔄 Created job {job_id}")
+        
+        # Poll until the job finishes, collecting results incrementally
+        results = []
+        offset = 0
+        for _ in range(60):
+            status = requests.get(f'http://localhost:5000/api/jobs/{job_id}').json()
+            page = requests.get(f'http://localhost:5000/api/jobs/{job_id}/results', params={'offset': offset}).json()
+            results.extend(page['results'])
+            offset = page['next_offset']
+            if status['status'] in ('completed', 'failed'):
+                break
+            time.sleep(1)
+        
+        print(f"   Status: {status['status']}, URLs done: {status['urls_done']}/{status['total_urls']}")
+        print(f"   Courses found: {status['courses_found']}")
+        if status['status'] == 'completed' and len(results) == status['total_urls']:
+            print("✅ Job completed and all results were fetched")
+            return True
+        print("❌ Job did not complete in time")
+        return False
+        
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request failed: {e}")
+        return False
+
+def test_stream_endpoint():
+    """Test that the streaming endpoint emits NDJSON events ending with 'done'"""
+    test_url = "https://www.coursera.org/courses"
+    
+    try:
+        response = requests.post(
+            'http://localhost:5000/api/extract/stream',
+            json={"urls": [test_url]},
+            stream=True,
+            timeout=60
+        )
+        if response.status_code != 200:
+            print(f"❌ Streaming extraction failed: {response.status_code}")
+            return False
+        
+        events = [json.loads(line) for line in response.iter_lines() if line]
+        courses = sum(1 for event in events if event['type'] == 'course')
+        print(f"   Received {len(events)} events, {courses} courses")
+        
+        if events and events[-1]['type'] == 'done' and events[-1]['total_courses'] == courses:
+            print("✅ Stream completed with a matching 'done' event")
+            return True
+        print("❌ Stream did not end with a matching 'done' event")
+        return False
+        
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request failed: {e}")
+        return False
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """Serves three-page course catalogs linked by "Next" and page-number links
+    
+    /catalog lists courses in a table; /cards lists them as cards whose only
+    link is an identical "Read more" pointing at a /courses/ detail page.
+    /slow is a single page of cards whose detail pages, except the first,
+    take `delay` seconds to answer.
+    """
+    pages = 3
+    cards = 3
+    delay = 5
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        page = int(parse_qs(url.query).get('page', ['1'])[0])
+        if url.path.startswith('/courses/'):
+            slug = url.path.rsplit('/', 1)[-1]
+            if slug.startswith('slow-') and slug != 'slow-1':
+                time.sleep(self.delay)
+            body = f"<html><body><h1>Course {slug}</h1><p>Duration: 4 weeks</p></body></html>"
+        elif url.path == '/slow':
+            cards = ''.join(
+                f'<li><a href="/courses/slow-{n}">Read more</a></li>' for n in range(1, self.cards + 1)
+            )
+            body = f"<html><body><ul>{cards}</ul></body></html>"
+        elif url.path == '/cards':
+            cards = ''.join(
+                f'<li><p>Course {page}-{n}</p><a href="/courses/{page}-{n}">Read more</a></li>'
+                for n in range(1, self.cards + 1)
+            )
+            body = f"<html><body><ul>{cards}</ul>{self._pager('/cards', page)}</body></html>"
+        else:
+            rows = ''.join(
+                f"<tr><td>Course {page}-{n}</td><td>{n} weeks</td><td>${n}00</td></tr>" for n in (1, 2)
+            )
+            body = (
+                "<html><body><table><tr><th>Course Title</th><th>Duration</th><th>Course Fee</th></tr>"
+                f"{rows}</table>{self._pager('/catalog', page)}</body></html>"
+            )
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.end_headers()
+        self.wfile.write(body.encode())
+    
+    def _pager(self, path, page):
+        pager = ''.join(f'<a href="{path}?page={n}">{n}</a> ' for n in range(1, self.pages + 1))
+        if page < self.pages:
+            pager += f'<a href="{path}?page={page + 1}">Next</a>'
+        return f'<div class="pagination">{pager}</div>'
+    
+    def log_message(self, *args):
+        pass
+
+def test_paginated_crawl():
+    """Test that extraction follows pagination on local fixture catalogs"""
+    server = HTTPServer(('127.0.0.1', 0), CatalogHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    catalogs = [
+        # Cards repeat the same "Read more" link text on every page
+        ('/catalog', CatalogHandler.pages * 2),
+        ('/cards', CatalogHandler.pages * CatalogHandler.cards),
+    ]
+    
+    try:
+        response = requests.post(
+            'http://localhost:5000/api/extract',
+            json={"urls": [base_url + path for path, _ in catalogs]},
+            timeout=120
+        )
+        if response.status_code != 200:
+            print(f"❌ Extraction failed: {response.status_code}")
+            return False
+        
+        passed = True
+        for (path, expected), result in zip(catalogs, response.json()['results']):
+            courses = result.get('courses', [])
+            names = sorted(course['course_name'] for course in courses)
+            print(f"   Extracted {len(courses)} courses from {CatalogHandler.pages} {path} pages")
+            if len(courses) != expected or len(set(names)) != expected:
+                print(f"❌ Expected {expected} distinct courses from {path}, got {names}")
+                passed = False
+        
+        if passed:
+            print("✅ All catalog pages were crawled once")
+        return passed
+        
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request failed: {e}")
+        return False
+    finally:
+        server.shutdown()
+
+def test_stream_deadline():
+    """Test that courses streamed before a URL times out are counted and exportable"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CatalogHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    test_url = f"http://127.0.0.1:{server.server_port}/slow"
+    
+    try:
+        response = requests.post(
+            'http://localhost:5000/api/extract/stream',
+            json={"urls": [test_url], "deadline": 2},
+            stream=True,
+            timeout=60
+        )
+        if response.status_code != 200:
+            print(f"❌ Streaming extraction failed: {response.status_code}")
+            return False
+        
+        events = [json.loads(line) for line in response.iter_lines() if line]
+        courses = sum(1 for event in events if event['type'] == 'course')
+        done = events[-1] if events else {}
+        print(f"   Streamed {courses} courses before the deadline, 'done' reports {done.get('total_courses')}")
+        if not courses or done.get('type') != 'done' or done['total_courses'] != courses:
+            print("❌ Streamed courses of the timed-out URL were not counted")
+            return False
+        
+        export = requests.post(
+            'http://localhost:5000/api/export/csv',
+            json={"result_id": done['result_id']},
+            timeout=30
+        )
+        rows = len(export.text.strip().splitlines()) - 1
+        if export.status_code == 200 and rows == courses:
+            print("✅ Streamed courses were stored and exported")
+            return True
+        print(f"❌ Export returned {export.status_code} with {rows} rows")
+        return False
+        
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request failed: {e}")
+        return False
+    finally:
+        server.shutdown()
+
 def test_main_page():
     """Test if the main page loads correctly"""
     try:
@@ -90,7 +295,11 @@ def main():
     tests = [
         ("Main Page", test_main_page),
         ("Health Endpoint", test_health_endpoint),
-        ("Extraction Endpoint", test_extraction_endpoint)
+        ("Extraction Endpoint", test_extraction_endpoint),
+        ("Jobs Endpoint", test_jobs_endpoint),
+        ("Stream Endpoint", test_stream_endpoint),
+        ("Stream Deadline", test_stream_deadline),
+        ("Paginated Crawl", test_paginated_crawl)
     ]
     
     passed = 0